@@ -0,0 +1,28 @@
+"""Add updated_at to lessons
+
+Revision ID: e3a91c07b2d4
+Revises: d0b75c1eb451
+Create Date: 2026-10-18 09:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a91c07b2d4'
+down_revision: Union[str, Sequence[str], None] = 'd0b75c1eb451'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lets workers detect lessons edited by other workers
+    op.add_column('lessons', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('lessons', 'updated_at')
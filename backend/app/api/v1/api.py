@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import modules, lessons, exercises, users, progress, content
+from app.api.v1.endpoints import modules, lessons, exercises, users, progress, content, search
 
 api_router = APIRouter()
 
@@ -9,4 +9,5 @@ api_router.include_router(lessons.router, prefix="/lessons", tags=["lessons"])
 api_router.include_router(exercises.router, prefix="/exercises", tags=["exercises"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
-api_router.include_router(content.router, prefix="/content", tags=["content"]) 
\ No newline at end of file
+api_router.include_router(content.router, prefix="/content", tags=["content"])
+api_router.include_router(search.router, prefix="/search", tags=["search"]) 
\ No newline at end of file
@@ -1,48 +1,122 @@
 """
 Content management endpoints for modules, lessons, exercises, and glossary.
 """
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.core.content_loader import content_loader, Exercise, LessonContent, GlossaryEntry
+from app.core.content_snapshot import InvalidContentError
+from app.core.glossary_index import SUGGEST_MAX
+from app.core.invalidation_bus import invalidation_bus
+from app.core.response_cache import choose_encoding
 
 router = APIRouter()
 
 
+def _etag(content_hash: Optional[str], *params: Optional[object]) -> Optional[str]:
+    """Build a strong ETag from a content hash and the representation's parameters."""
+    if content_hash is None:
+        return None
+    key = "\x1f".join([content_hash] + ["" if param is None else str(param) for param in params])
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": settings.CONTENT_CACHE_CONTROL}
+
+
+def _client_has(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag, ignoring content-coding suffixes."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    base = etag.strip('"')
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*":
+            return True
+        tag = tag.strip('"')
+        if tag in (base, f"{base}-gzip", f"{base}-br"):
+            return True
+    return False
+
+
+def _not_modified(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Set caching headers, returning a 304 response if the client's copy is current."""
+    if etag is None:
+        return None
+    response.headers.update(_cache_headers(etag))
+    if _client_has(request, etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+    return None
+
+
+def _cached_json(request: Request, etag: Optional[str], build: Callable[[], Any]) -> Any:
+    """
+    Serve a static payload from the pre-serialized response cache.
+    
+    The body is built, serialized and compressed once per resource and
+    ETag, then sent in the best encoding the client accepts.
+    """
+    if etag is None:
+        return build()
+    
+    # ETags come from content hashes, which identical files share
+    payload = content_loader.get_encoded_response(f"{request.url.path}\x1f{etag}", build)
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), list(payload.bodies))
+    headers = _cache_headers(etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"')
+    headers["Vary"] = "Accept-Encoding"
+    
+    if _client_has(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=payload.bodies[encoding], media_type="application/json", headers=headers)
+
+
 @router.get("/modules", response_model=List[dict])
-async def get_modules():
+async def get_modules(request: Request):
     """Get all available modules with metadata."""
     try:
-        modules = content_loader.get_modules()
-        return modules
+        modules = await content_loader.aget_modules()
+        return _cached_json(request, _etag(content_loader.get_content_hash("modules")), lambda: modules)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading modules: {str(e)}")
 
 
 @router.get("/modules/{module_id}")
-async def get_module(module_id: str):
+async def get_module(module_id: str, request: Request):
     """Get a specific module with its lesson content and exercises."""
     try:
         # Get module metadata
-        modules = content_loader.get_modules()
+        modules = await content_loader.aget_modules()
         module = next((m for m in modules if m["id"] == module_id), None)
         
         if not module:
             raise HTTPException(status_code=404, detail="Module not found")
         
         # Get lesson content
-        lesson_content = content_loader.get_lesson_content(module_id)
+        lesson_content = await content_loader.aget_lesson_content(module_id)
         if not lesson_content:
             raise HTTPException(status_code=404, detail="Lesson content not found")
         
         # Get exercises
-        exercises = content_loader.get_exercises(module_id)
+        exercises = await content_loader.aget_exercises(module_id)
         
-        return {
+        etag = _etag(
+            content_loader.get_content_hash("lesson", module_id),
+            content_loader.get_content_hash("exercises", module_id),
+            module_id
+        )
+        return _cached_json(request, etag, lambda: {
             "module": module,
             "lesson": lesson_content.dict(),
             "exercises": [ex.dict() for ex in exercises],
             "exercise_count": len(exercises)
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -50,41 +124,142 @@ async def get_module(module_id: str):
 
 
 @router.get("/modules/{module_id}/lesson")
-async def get_lesson(module_id: str):
+async def get_lesson(
+    module_id: str,
+    request: Request,
+    format: str = Query(
+        "markdown",
+        pattern="^(markdown|html|ast)$",
+        description="markdown source, sanitized html, or a JSON ast; html and ast include a table of contents"
+    ),
+    glossary_links: bool = Query(
+        False,
+        description="Link glossary terms (html, ast) or list their spans in the markdown (glossary_terms)"
+    )
+):
     """Get lesson content for a specific module."""
     try:
-        lesson_content = content_loader.get_lesson_content(module_id)
+        lesson_content = await content_loader.aget_lesson_content(module_id)
         if not lesson_content:
             raise HTTPException(status_code=404, detail="Lesson not found")
         
-        return lesson_content.dict()
+        content_hash = content_loader.get_content_hash("lesson", module_id)
+        linked = None
+        glossary_hash = None
+        if glossary_links:
+            linked = await content_loader.aget_linked_lesson(module_id)
+            # Linked representations also change with the glossary
+            glossary_hash = content_loader.get_content_hash("glossary") or ""
+        
+        if format == "markdown":
+            if linked is None:
+                return _cached_json(request, _etag(content_hash), lesson_content.dict)
+            return _cached_json(request, _etag(content_hash, glossary_hash), lambda: {
+                **lesson_content.dict(),
+                "glossary_terms": linked.spans
+            })
+        
+        rendered = await content_loader.aget_rendered_lesson(module_id)
+        if rendered is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        source = linked or rendered
+        return _cached_json(request, _etag(content_hash, glossary_hash, format), lambda: {
+            "title": lesson_content.title,
+            "order": lesson_content.order,
+            "module": lesson_content.module,
+            "toc": rendered.toc,
+            "headings": rendered.headings,
+            format: source.html if format == "html" else source.ast
+        })
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading lesson: {str(e)}")
 
 
+@router.get("/modules/{module_id}/lesson/sections")
+async def get_lesson_sections(module_id: str, request: Request):
+    """Get a lesson's table of contents for loading it section by section."""
+    try:
+        index = await content_loader.run("sections", content_loader.get_lesson_sections, module_id)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        
+        return _cached_json(request, _etag(index.content_hash, "sections", module_id), lambda: {
+            "module": module_id,
+            "sections": index.toc()
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading lesson sections: {str(e)}")
+
+
+@router.get("/modules/{module_id}/lesson/sections/{index}")
+async def get_lesson_section(
+    module_id: str,
+    index: int,
+    request: Request,
+    end: Optional[int] = Query(None, description="Exclusive end index, to load a range of sections"),
+    subsections: bool = Query(False, description="Include the section's nested subsections")
+):
+    """Get one section, or a range of sections, of a lesson."""
+    try:
+        sections = await content_loader.run("sections", content_loader.get_lesson_sections, module_id)
+        if sections is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        if end is None:
+            end = sections.subsections_end(index) if subsections and 0 <= index < len(sections) else index + 1
+        if not 0 <= index < end <= len(sections):
+            raise HTTPException(status_code=404, detail="Section not found")
+        
+        etag = _etag(sections.content_hash, "section", module_id, index, end)
+        # Read through the same index the range was checked against
+        content = await content_loader.run(
+            "section", content_loader.read_lesson_sections, module_id, index, end, sections
+        )
+        return _cached_json(request, etag, lambda: {
+            "module": module_id,
+            "start": index,
+            "end": end,
+            "sections": sections.toc()[index:end],
+            "content": content
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading lesson section: {str(e)}")
+
+
 @router.get("/modules/{module_id}/exercises")
-async def get_exercises(module_id: str):
+async def get_exercises(module_id: str, request: Request):
     """Get exercises for a specific module."""
     try:
-        exercises = content_loader.get_exercises(module_id)
-        return [ex.dict() for ex in exercises]
+        exercises = await content_loader.aget_exercises(module_id)
+        
+        etag = _etag(content_loader.get_content_hash("exercises", module_id))
+        return _cached_json(request, etag, lambda: [ex.dict() for ex in exercises])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading exercises: {str(e)}")
 
 
 @router.get("/exercises/{exercise_id}")
-async def get_exercise(module_id: str, exercise_id: str):
-    """Get a specific exercise by ID."""
+async def get_exercise(
+    exercise_id: str,
+    module_id: Optional[str] = Query(None, description="Module the exercise belongs to")
+):
+    """Get a specific exercise by ID, or by content ID without a module."""
     try:
-        exercises = content_loader.get_exercises(module_id)
-        exercise = next((ex for ex in exercises if ex.id == exercise_id), None)
+        record = await content_loader.aget_exercise(exercise_id, module_id)
         
-        if not exercise:
+        if not record:
             raise HTTPException(status_code=404, detail="Exercise not found")
         
-        return exercise.dict()
+        return {
+            **record.exercise.dict(),
+            "module_id": record.module_id,
+            "content_id": record.content_id
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -93,29 +268,89 @@ async def get_exercise(module_id: str, exercise_id: str):
 
 @router.get("/glossary")
 async def get_glossary(
+    request: Request,
+    response: Response,
     query: Optional[str] = Query(None, description="Search term"),
-    category: Optional[str] = Query(None, description="Filter by category")
+    category: Optional[str] = Query(None, description="Filter by category"),
+    skip: int = Query(0, ge=0, description="Number of entries to skip"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of entries to return"),
+    fuzzy: bool = Query(True, description="Return typo-corrected matches when the search finds nothing")
 ):
-    """Get glossary entries with optional search and category filtering."""
+    """
+    Get glossary entries with optional search, category filtering and pagination.
+    
+    When a search matches nothing, entries for the typo-corrected query are
+    returned instead and the correction is sent in an X-Did-You-Mean header.
+    """
     try:
+        glossary = await content_loader.aget_glossary()
+        end = skip + limit if limit is not None else None
+        corrected = None
         if query:
-            entries = content_loader.search_glossary(query)
+            entries = content_loader.search_glossary(query, skip=skip, limit=limit)
+            if not entries and fuzzy:
+                # Nothing matched as typed; fall back to typo-corrected results
+                corrected, entries = content_loader.fuzzy_search_glossary(query, skip=skip, limit=limit)
         elif category:
-            entries = content_loader.get_glossary_by_category(category)
+            entries = content_loader.get_glossary_by_category(category)[skip:end]
         else:
-            entries = content_loader.get_glossary()
+            entries = glossary[skip:end]
+        
+        etag = _etag(content_loader.get_content_hash("glossary"), query, category, skip, limit, fuzzy)
+        if corrected:
+            response.headers["X-Did-You-Mean"] = corrected
+        if not (query or category or skip or limit):
+            # The full glossary is static; searches are too varied to pre-serialize
+            return _cached_json(request, etag, lambda: [entry.dict() for entry in entries])
+        
+        not_modified = _not_modified(request, response, etag)
+        if not_modified:
+            return not_modified
         
         return [entry.dict() for entry in entries]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading glossary: {str(e)}")
 
 
+@router.get("/glossary/suggest")
+async def suggest_glossary_terms(
+    prefix: str = Query(..., min_length=1, description="Partial term typed by the user"),
+    limit: int = Query(SUGGEST_MAX, ge=1, le=SUGGEST_MAX, description="Maximum number of suggestions")
+):
+    """
+    Get glossary term completions for type-ahead search.
+    
+    When nothing completes the prefix, did_you_mean lists the terms of the
+    closest typo-corrected matches.
+    """
+    try:
+        await content_loader.aget_glossary()
+        suggestions = content_loader.suggest_glossary_terms(prefix, limit)
+        did_you_mean: List[str] = []
+        if not suggestions:
+            _, entries = content_loader.fuzzy_search_glossary(prefix, limit=limit)
+            did_you_mean = [entry.term for entry in entries]
+        return {"suggestions": suggestions, "did_you_mean": did_you_mean}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading suggestions: {str(e)}")
+
+
+@router.get("/glossary/categories")
+async def get_glossary_categories():
+    """Get all available glossary categories."""
+    try:
+        await content_loader.aget_glossary()
+        return {"categories": content_loader.get_glossary_categories()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading categories: {str(e)}")
+
+
 @router.get("/glossary/{term}")
 async def get_glossary_term(term: str):
     """Get a specific glossary term."""
     try:
-        glossary = content_loader.get_glossary()
-        entry = next((entry for entry in glossary if entry.term.lower() == term.lower()), None)
+        await content_loader.aget_glossary()
+        entry = content_loader.get_glossary_entry(term)
         
         if not entry:
             raise HTTPException(status_code=404, detail="Glossary term not found")
@@ -127,45 +362,64 @@ async def get_glossary_term(term: str):
         raise HTTPException(status_code=500, detail=f"Error loading glossary term: {str(e)}")
 
 
-@router.get("/glossary/categories")
-async def get_glossary_categories():
-    """Get all available glossary categories."""
-    try:
-        glossary = content_loader.get_glossary()
-        categories = list(set(entry.category for entry in glossary))
-        return {"categories": sorted(categories)}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error loading categories: {str(e)}")
-
-
 @router.get("/content/validate")
-async def validate_content():
+async def validate_content(
+    stream: bool = Query(False, description="Stream one JSON line per module, then the summary"),
+    full: bool = Query(False, description="Re-check every module, ignoring cached results")
+):
     """Validate all content files and return any errors."""
     try:
-        errors = content_loader.validate_content()
-        has_errors = any(len(error_list) > 0 for error_list in errors.values())
-        
-        return {
-            "valid": not has_errors,
-            "errors": errors,
-            "summary": {
-                "modules": len(content_loader.get_modules()),
-                "glossary_entries": len(content_loader.get_glossary()),
-                "total_exercises": sum(
-                    len(content_loader.get_exercises(module["id"])) 
-                    for module in content_loader.get_modules()
-                )
-            }
-        }
+        if stream:
+            results = content_loader.iter_validation(use_cache=not full)
+            lines = (json.dumps(result) + "\n" for result in results)
+            return StreamingResponse(lines, media_type="application/x-ndjson")
+        return await content_loader.run("validate", content_loader.validation_report, None, not full)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error validating content: {str(e)}")
 
 
+async def _broadcast_invalidation(event: str) -> int:
+    """Have the other workers reload content; returns how many acknowledged."""
+    if invalidation_bus is None:
+        return 0
+    return await content_loader.run("broadcast", invalidation_bus.broadcast, event, content_loader.version)
+
+
 @router.post("/content/clear-cache")
 async def clear_content_cache():
-    """Clear the content cache to force reloading of content files."""
+    """Clear the content cache to force reloading of content files, in every worker."""
     try:
         content_loader.clear_cache()
-        return {"message": "Content cache cleared successfully"}
+        acknowledged = await _broadcast_invalidation("clear-cache")
+        return {"message": "Content cache cleared successfully", "workers_acknowledged": acknowledged}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
+
+
+@router.post("/content/reload")
+async def reload_content():
+    """Reload only the content files that changed on disk, in every worker."""
+    try:
+        if content_loader.snapshot is not None:
+            # Publish once; the other workers follow the snapshot version counter
+            await content_loader.run("publish", content_loader.publish_snapshot)
+        changes = await content_loader.run("refresh", content_loader.refresh)
+        acknowledged = await _broadcast_invalidation("reload")
+        return {"message": "Content reloaded successfully", "changes": changes, "workers_acknowledged": acknowledged}
+    except InvalidContentError as e:
+        # The current snapshot stays in place
+        raise HTTPException(status_code=422, detail=f"Content not published: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading content: {str(e)}")
+
+
+@router.get("/content/cache-stats")
+async def get_content_cache_stats():
+    """Get cache counters and loader latency metrics."""
+    try:
+        return {
+            **content_loader.get_cache_stats(),
+            "operations": content_loader.get_operation_metrics()
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error loading cache stats: {str(e)}")
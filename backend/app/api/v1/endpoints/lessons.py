@@ -7,6 +7,7 @@ from app.models.module import Module
 from app.models.exercise import Exercise
 from app.schemas.lesson import LessonCreate, LessonUpdate, LessonResponse
 from app.api.deps import get_current_active_user
+from app.core.db_lesson_search import index_db_lesson, remove_db_lesson
 from app.models.user import User
 import uuid
 
@@ -145,13 +146,15 @@ async def create_lesson(
         db.add(db_lesson)
         db.commit()
         db.refresh(db_lesson)
-        return LessonResponse.model_validate(db_lesson)
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create lesson"
         )
+    
+    index_db_lesson(db_lesson)
+    return LessonResponse.model_validate(db_lesson)
 
 
 @router.put("/{lesson_id}", response_model=LessonResponse)
@@ -200,13 +203,15 @@ async def update_lesson(
     try:
         db.commit()
         db.refresh(db_lesson)
-        return LessonResponse.model_validate(db_lesson)
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update lesson"
         )
+    
+    index_db_lesson(db_lesson)
+    return LessonResponse.model_validate(db_lesson)
 
 
 @router.delete("/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -249,4 +254,6 @@ async def delete_lesson(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete lesson"
-        ) 
\ No newline at end of file
+        )
+    
+    remove_db_lesson(lesson_uuid) 
\ No newline at end of file
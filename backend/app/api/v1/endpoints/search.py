@@ -0,0 +1,94 @@
+"""
+Full-text search endpoints over lessons, exercises and glossary entries.
+"""
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.api.deps import get_current_active_user
+from app.core.content_loader import content_loader
+from app.core.db_lesson_search import db_document, db_version
+from app.db.base import get_db
+from app.models.lesson import Lesson
+from app.models.user import User
+
+router = APIRouter()
+
+# Changed lessons loaded per query while syncing the search index
+SYNC_BATCH_SIZE = 500
+
+
+def sync_db_lessons(db: Session) -> None:
+    """
+    Bring the index in line with the lessons table.
+
+    Lessons are only re-read when the row count, newest row or latest update
+    changed (e.g. written by another worker); within a worker, the lessons
+    endpoints keep the index current. Only lessons updated since they were
+    indexed are loaded and re-tokenized; blocking, so run it off the event
+    loop.
+    """
+    version = tuple(
+        db.query(func.count(Lesson.id), func.max(Lesson.created_at), func.max(Lesson.updated_at)).one()
+    )
+    rows: Dict[Tuple[str, str], Any] = {}
+
+    def documents() -> Iterator[Tuple[Tuple[str, str], Any]]:
+        index = content_loader.search_index
+        current = []
+        changed = []
+        for lesson in db.query(Lesson.id, Lesson.created_at, Lesson.updated_at):
+            doc_id, doc_version = ("db", str(lesson.id)), db_version(lesson)
+            current.append((doc_id, doc_version))
+            if index.version(doc_id) != doc_version:
+                changed.append(lesson.id)
+        for start in range(0, len(changed), SYNC_BATCH_SIZE):
+            batch = changed[start:start + SYNC_BATCH_SIZE]
+            columns = (Lesson.id, Lesson.module_id, Lesson.title, Lesson.content, Lesson.created_at, Lesson.updated_at)
+            for row in db.query(*columns).filter(Lesson.id.in_(batch)):
+                doc_id, _, title, text, fields = db_document(row)
+                rows[doc_id] = (title, text, fields)
+        return iter(current)
+
+    content_loader.sync_search_source("db", version, documents, rows.get)
+
+
+@router.get("/")
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    type: Optional[List[Literal["lesson", "exercise", "glossary"]]] = Query(None, description="Only return these result types"),
+    source: Optional[str] = Query(None, pattern="^(content|db)$", description="Only search one source"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Search lessons, exercises and glossary entries in one ranked list.
+    
+    Results carry their type and a fused relevance score; facets count the
+    matches of every type so clients can offer type filters.
+    """
+    try:
+        if source != "content" and (not type or "lesson" in type):
+            await content_loader.run("sync_db", sync_db_lessons, db)
+        total, hits, facets = await content_loader.run("search", content_loader.search, q, skip, limit, type, source)
+        return {
+            "query": q,
+            "total": total,
+            "facets": {"type": {kind: facets.get(kind, 0) for kind in ("lesson", "exercise", "glossary")}},
+            "results": [
+                {
+                    "id": hit.doc_id[-1],
+                    **hit.fields,
+                    "title": hit.title,
+                    "score": hit.score,
+                    "snippet": hit.snippet,
+                }
+                for hit in hits
+            ],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching content: {str(e)}")
@@ -33,6 +33,18 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Content
+    CONTENT_RELOAD_INTERVAL: float = 2.0  # Seconds between on-disk change checks; 0 disables
+    CONTENT_STALE_WHILE_REVALIDATE: bool = False  # Serve the old content while reloads build in the background
+    CONTENT_LOADER_THREADS: int = 4  # Max concurrent blocking content loads per worker
+    CONTENT_CACHE_CONTROL: str = "public, no-cache"  # Clients revalidate with If-None-Match
+    CONTENT_VALIDATION_WORKERS: int = 0  # Processes for full-catalog validation; 0 uses one per CPU
+    CONTENT_VALIDATION_CACHE_PATH: str = ".content-validation-cache.json"  # Reuse results for unchanged modules; empty disables
+    CONTENT_BUNDLE_PATH: str = ""  # Compiled bundle to serve from; required outside development when set
+    CONTENT_SNAPSHOT_DIR: str = ""  # Shared directory workers publish to and map one content snapshot from
+    CONTENT_INVALIDATION_BUS: str = ""  # postgresql:// URL or shared directory for cross-worker reloads; empty disables
+    CONTENT_WARM_UP: bool = True  # Load and index all content at startup; /health/ready waits for it
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -0,0 +1,192 @@
+"""
+Compiled content bundles.
+
+A bundle packs the whole ``content/`` tree into one versioned file: a small
+JSON manifest (module metadata, blob offsets and content hashes) followed by
+pre-validated lesson, exercise and glossary payloads. The loader memory-maps
+the file and only decodes the blobs it is asked for.
+
+File layout::
+
+    MAGIC (4 bytes) | format version (uint32) | manifest length (uint32)
+    manifest JSON | blob data
+"""
+import hashlib
+import json
+import mmap
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+MAGIC = b"GACB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">4sII")
+
+
+class BundleError(Exception):
+    """Raised when a content bundle is missing, corrupt or incompatible."""
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_bundle(
+    content_dir: Union[str, Path],
+    output_path: Union[str, Path],
+    allow_errors: bool = False,
+    validation_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compile a content directory into a bundle file.
+
+    When validation reports errors the output file is left untouched,
+    unless allow_errors is set. validation_workers is passed to the
+    validating loader (None uses one process per CPU for large catalogs).
+
+    Returns:
+        The manifest (written or not), plus an ``errors`` key with the
+        validation errors reported for the source tree.
+    """
+    # Imported lazily: the loader itself imports this module
+    from app.core.content_loader import ContentLoader
+
+    loader = ContentLoader(str(content_dir), validation_workers=validation_workers)
+    errors = loader.validate_content()
+
+    blobs: List[bytes] = []
+    offset = 0
+
+    def add_blob(payload: Any) -> Dict[str, Any]:
+        nonlocal offset
+        data = _encode(payload)
+        ref = {
+            "offset": offset,
+            "length": len(data),
+            "hash": hashlib.sha256(data).hexdigest(),
+        }
+        blobs.append(data)
+        offset += len(data)
+        return ref
+
+    modules = []
+    for module in loader.get_modules():
+        module_id = module["id"]
+        lesson = loader.get_lesson_content(module_id)
+        if lesson is None:
+            continue
+        exercises_file = Path(module["exercises_file"])
+        modules.append({
+            "id": module_id,
+            "title": module["title"],
+            "order": module["order"],
+            "module": module["module"],
+            "lesson": add_blob(lesson.model_dump()),
+            "exercises": (
+                add_blob([ex.model_dump() for ex in loader.get_exercises(module_id)])
+                if exercises_file.exists() else None
+            ),
+        })
+
+    glossary_file = loader.content_dir / "glossary.json"
+    glossary = (
+        add_blob([entry.model_dump() for entry in loader.get_glossary()])
+        if glossary_file.exists() else None
+    )
+
+    version_hash = hashlib.sha256()
+    for module in modules:
+        version_hash.update(module["lesson"]["hash"].encode())
+        if module["exercises"]:
+            version_hash.update(module["exercises"]["hash"].encode())
+    if glossary:
+        version_hash.update(glossary["hash"].encode())
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version_hash.hexdigest()[:16],
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "modules": modules,
+        "glossary": glossary,
+    }
+    if any(errors.values()) and not allow_errors:
+        return dict(manifest, errors=errors)
+    manifest_data = _encode(manifest)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(manifest_data)))
+        f.write(manifest_data)
+        for data in blobs:
+            f.write(data)
+    # Atomic replace so running workers never map a half-written bundle
+    tmp_path.replace(output_path)
+
+    return dict(manifest, errors=errors)
+
+
+class ContentBundle:
+    """Read-only, memory-mapped view over a compiled content bundle."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise BundleError(f"Cannot open content bundle {self.path}: {e}") from e
+
+        if len(self._mmap) < HEADER.size:
+            raise BundleError(f"Content bundle {self.path} is truncated")
+        magic, format_version, manifest_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise BundleError(f"{self.path} is not a content bundle")
+        if format_version != FORMAT_VERSION:
+            raise BundleError(f"Unsupported content bundle format {format_version}")
+
+        manifest_end = HEADER.size + manifest_length
+        self.manifest: Dict[str, Any] = json.loads(self._mmap[HEADER.size:manifest_end])
+        self._data_start = manifest_end
+        self._modules: Dict[str, Dict[str, Any]] = {
+            module["id"]: module for module in self.manifest["modules"]
+        }
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _read(self, ref: Optional[Dict[str, Any]]) -> Any:
+        if ref is None:
+            return None
+        start = self._data_start + ref["offset"]
+        return json.loads(self._mmap[start:start + ref["length"]])
+
+    def modules(self) -> List[Dict[str, Any]]:
+        """Module metadata entries in manifest order."""
+        return self.manifest["modules"]
+
+    def module(self, module_id: str) -> Optional[Dict[str, Any]]:
+        return self._modules.get(module_id)
+
+    def lesson(self, module_id: str) -> Optional[Dict[str, Any]]:
+        module = self._modules.get(module_id)
+        return self._read(module["lesson"]) if module else None
+
+    def exercises(self, module_id: str) -> Optional[List[Dict[str, Any]]]:
+        module = self._modules.get(module_id)
+        return self._read(module["exercises"]) if module else None
+
+    def glossary(self) -> Optional[List[Dict[str, Any]]]:
+        return self._read(self.manifest["glossary"])
+
+    def content_hash(self, module_id: str, kind: str) -> Optional[str]:
+        """Content hash of a module's ``lesson`` or ``exercises`` blob."""
+        module = self._modules.get(module_id)
+        ref = module.get(kind) if module else None
+        return ref["hash"] if ref else None
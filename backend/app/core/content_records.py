@@ -0,0 +1,227 @@
+"""
+Compact read-only records for cached content.
+
+The Pydantic models validate content as it is parsed and define the API
+schema, but every instance carries a __dict__ and validation bookkeeping.
+The loader keeps parsed content as __slots__ records instead: strings that
+repeat across a catalog (ids, types, difficulties, categories, module ids)
+are interned, lists are stored as tuples, and records produce the models'
+dicts only when a response is serialized.
+"""
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from pydantic import BaseModel
+
+
+def intern(value: Any) -> Any:
+    """Intern a string so equal values share one object; other values pass through."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _interned_tuple(values: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    return None if values is None else tuple(intern(value) for value in values)
+
+
+class _Record:
+    """Base for immutable content records serialized like their Pydantic model."""
+
+    __slots__ = ()
+    # Field names in the order of the matching Pydantic model
+    _fields: Tuple[str, ...] = ()
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the same dict as the matching Pydantic model's model_dump()."""
+        data = {}
+        for name in self._fields:
+            value = getattr(self, name)
+            data[name] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    # Endpoints serialize content with the Pydantic v1 spelling
+    dict = model_dump
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _set(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        # Equal to a record or model with the same fields
+        if isinstance(other, (_Record, BaseModel)):
+            return self.model_dump() == other.model_dump()
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields if name != "content")
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.model_dump()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        type(self).__init__(self, **state)
+
+
+class ExerciseRecord(_Record):
+    """A content exercise."""
+
+    __slots__ = ("id", "type", "prompt", "answer", "explanation", "difficulty", "options", "acceptable_answers")
+    _fields = __slots__
+
+    id: str
+    type: str
+    prompt: str
+    answer: str
+    explanation: str
+    difficulty: str
+    options: Optional[Tuple[str, ...]]
+    acceptable_answers: Optional[Tuple[str, ...]]
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        prompt: str,
+        answer: str,
+        explanation: str,
+        difficulty: str = "easy",
+        options: Optional[Iterable[str]] = None,
+        acceptable_answers: Optional[Iterable[str]] = None,
+    ):
+        self._set("id", intern(id))
+        self._set("type", intern(type))
+        self._set("prompt", prompt)
+        self._set("answer", intern(answer))
+        self._set("explanation", explanation)
+        self._set("difficulty", intern(difficulty))
+        self._set("options", _interned_tuple(options))
+        self._set("acceptable_answers", _interned_tuple(acceptable_answers))
+
+    @classmethod
+    def from_model(cls, exercise: BaseModel) -> "ExerciseRecord":
+        return cls(**exercise.model_dump())
+
+
+class GlossaryRecord(_Record):
+    """A glossary entry."""
+
+    __slots__ = ("term", "definition", "examples", "related_lessons", "category")
+    _fields = __slots__
+
+    term: str
+    definition: str
+    examples: Tuple[str, ...]
+    related_lessons: Tuple[str, ...]
+    category: str
+
+    def __init__(
+        self,
+        term: str,
+        definition: str,
+        examples: Iterable[str],
+        related_lessons: Iterable[str],
+        category: str,
+    ):
+        self._set("term", term)
+        self._set("definition", definition)
+        self._set("examples", _interned_tuple(examples))
+        self._set("related_lessons", _interned_tuple(related_lessons))
+        self._set("category", intern(category))
+
+    @classmethod
+    def from_model(cls, entry: BaseModel) -> "GlossaryRecord":
+        return cls(**entry.model_dump())
+
+
+class LessonRecord(_Record):
+    """
+    A lesson, optionally built from its frontmatter header alone.
+
+    A deferred lesson reads its markdown body the first time ``content`` is
+    accessed or the lesson is serialized.
+    """
+
+    __slots__ = ("title", "order", "module", "_content", "_read_body", "_body_size", "_content_hash", "_body_lock")
+    _fields = ("title", "order", "module", "content")
+
+    title: str
+    order: int
+    module: str
+    _content: Optional[str]
+    _read_body: Optional[Callable[[], Tuple[str, str]]]
+    _body_size: int
+    _content_hash: Optional[str]
+    _body_lock: Optional[threading.Lock]
+
+    def __init__(self, title: str, order: int, module: str, content: Optional[str] = None):
+        self._set("title", title)
+        self._set("order", order)
+        self._set("module", intern(module))
+        self._set("_content", content)
+        self._set("_read_body", None)
+        self._set("_body_size", len(content) if content is not None else 0)
+        self._set("_content_hash", None)
+        self._set("_body_lock", None)
+
+    @classmethod
+    def deferred(
+        cls,
+        read_body: Callable[[], Tuple[str, str]],
+        body_size: int,
+        title: str,
+        order: int,
+        module: str,
+    ) -> "LessonRecord":
+        """Build a lesson from header fields; read_body() returns (content, content_hash) later."""
+        lesson = cls(title, order, module)
+        lesson._set("_read_body", read_body)
+        lesson._set("_body_size", body_size)
+        lesson._set("_body_lock", threading.Lock())
+        return lesson
+
+    @property
+    def deferred_body(self) -> bool:
+        """Whether the body comes from read_body rather than the constructor."""
+        return self._read_body is not None
+
+    @property
+    def body_loaded(self) -> bool:
+        return self._content is not None
+
+    @property
+    def body_size(self) -> int:
+        """Size of the body, known without reading it."""
+        return self._body_size
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        """sha256 of the whole lesson file for deferred lessons; reads the body if needed."""
+        if not self.deferred_body:
+            return None
+        self.load_body()
+        return self._content_hash
+
+    def load_body(self) -> str:
+        content = self._content
+        if content is None:
+            # Only deferred lessons start without content
+            assert self._body_lock is not None and self._read_body is not None
+            with self._body_lock:
+                content = self._content
+                if content is None:
+                    content, content_hash = self._read_body()
+                    self._set("_content_hash", content_hash)
+                    self._set("_content", content)
+        return content
+
+    @property
+    def content(self) -> str:
+        return self.load_body()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Deferred lessons hold a file reader, which is not picklable
+        return self.model_dump()
@@ -0,0 +1,156 @@
+"""
+Content snapshots shared by all worker processes.
+
+A snapshot is a compiled content bundle published once into a shared
+directory. Every uvicorn/gunicorn worker memory-maps the same read-only file,
+so the compiled bytes are held once in the OS page cache and the content is
+compiled and validated once per publish rather than once per worker. Each
+worker still decodes the lessons and exercises it serves into its own caches
+and builds its own indexes. A version counter says which snapshot is current:
+publishing bumps it, and workers swap to the new file on their next refresh.
+
+Directory layout::
+
+    CURRENT                   "<counter> <bundle file name>"
+    snapshot-<counter>.bundle one compiled bundle per published version
+    snapshot.lock             held while a built bundle is being installed
+"""
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from app.core.content_bundle import BundleError, ContentBundle, build_bundle
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Published snapshots kept on disk; workers still mapping an older one keep
+# reading it (an unlinked file stays mapped), but new workers never see it
+KEEP_SNAPSHOTS = 2
+
+
+class InvalidContentError(BundleError):
+    """Raised when content with validation errors would be published."""
+
+    def __init__(self, errors: Dict[str, List[str]]):
+        self.errors = errors
+        messages = [message for messages in errors.values() for message in messages]
+        super().__init__(f"{len(messages)} validation error(s), first: {messages[0]}")
+
+
+class SnapshotInfo(NamedTuple):
+    """The current snapshot version counter and its bundle file."""
+    counter: int
+    path: Path
+
+
+class ContentSnapshot:
+    """A directory of published content bundles with a shared version counter."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._pointer = self.directory / "CURRENT"
+
+    def current(self) -> Optional[SnapshotInfo]:
+        """The published snapshot, or None if nothing was published yet."""
+        try:
+            counter, name = self._pointer.read_text().split()
+            return SnapshotInfo(int(counter), self.directory / name)
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize installs across worker processes."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "snapshot.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def build(self, content_dir: Union[str, Path], allow_errors: bool = False) -> Tuple[Optional[Path], Dict[str, Any]]:
+        """
+        Compile and validate content_dir into an unpublished bundle.
+
+        Runs without the lock and in this process only: validation must not
+        spawn workers that would import the loader and wait on the lock.
+
+        Returns:
+            The bundle path (None when validation failed and allow_errors is
+            not set) and the manifest with its ``errors``.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f".build-{os.getpid()}-{uuid.uuid4().hex[:8]}.bundle"
+        manifest = build_bundle(content_dir, path, allow_errors=allow_errors, validation_workers=1)
+        return (path if path.exists() else None), manifest
+
+    def install(self, path: Path, force: bool = False, first: bool = False) -> SnapshotInfo:
+        """
+        Publish a bundle from build() as the next snapshot.
+
+        The counter is only bumped when the bundle differs from the current
+        snapshot, unless force is set. With first, the bundle is only used
+        if nothing was published yet.
+        """
+        with self._locked():
+            current = self.current()
+            if current is not None and current.path.exists() and (
+                first or (not force and _bundle_version(current.path) == _bundle_version(path))
+            ):
+                path.unlink(missing_ok=True)
+                return current
+
+            counter = current.counter + 1 if current is not None else 1
+            target = self.directory / f"snapshot-{counter}.bundle"
+            os.replace(path, target)
+            # Atomic replace so workers never read a half-written counter
+            tmp_path = self._pointer.with_name("CURRENT.tmp")
+            tmp_path.write_text(f"{counter} {target.name}\n")
+            os.replace(tmp_path, self._pointer)
+            self._prune(counter)
+            return SnapshotInfo(counter, target)
+
+    def publish(self, content_dir: Union[str, Path], force: bool = False, allow_errors: bool = False) -> SnapshotInfo:
+        """Compile content_dir and publish it; raises InvalidContentError on validation errors."""
+        path, manifest = self.build(content_dir, allow_errors)
+        if path is None:
+            raise InvalidContentError(manifest["errors"])
+        return self.install(path, force)
+
+    def ensure(self, content_dir: Union[str, Path]) -> SnapshotInfo:
+        """Return the current snapshot, publishing the first one if needed."""
+        current = self.current()
+        if current is not None and current.path.exists():
+            return current
+        path, manifest = self.build(content_dir)
+        if path is None:
+            raise InvalidContentError(manifest["errors"])
+        # Another worker may have published while this one was building
+        return self.install(path, first=True)
+
+    def _prune(self, counter: int) -> None:
+        """Delete snapshots older than the last KEEP_SNAPSHOTS."""
+        for path in self.directory.glob("snapshot-*.bundle"):
+            try:
+                old = int(path.stem.split("-", 1)[1])
+            except ValueError:
+                continue
+            if old <= counter - KEEP_SNAPSHOTS:
+                path.unlink(missing_ok=True)
+
+
+def _bundle_version(path: Path) -> Optional[str]:
+    try:
+        bundle = ContentBundle(path)
+    except BundleError:
+        return None
+    try:
+        return bundle.version
+    finally:
+        bundle.close()
@@ -0,0 +1,250 @@
+"""
+Parallel content validation.
+
+Module checks are independent, so a full-catalog validation fans them out
+across worker processes and reports each module as soon as it is checked.
+Every module is parsed once per run; the report carries the counts the
+summary needs so nothing is parsed a second time. A ValidationCache persists
+reports between runs so only modules whose files changed are re-checked.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Bump whenever checks change so cached reports from older rules are discarded
+VALIDATION_VERSION = 1
+
+VALID_EXERCISE_TYPES = [
+    "identification",
+    "multiple_choice",
+    "fill_in_blank",
+    "sentence_construction",
+]
+
+# Below this many modules, process start-up costs more than it saves
+PARALLEL_MIN_MODULES = 16
+
+
+def check_module(module_id: str, lesson: Any, exercises: List[Any]) -> Dict[str, Any]:
+    """
+    Check one module's parsed lesson and exercises.
+
+    Returns a report with the module id, its errors by category and its
+    exercise count.
+    """
+    errors: Dict[str, List[str]] = {"modules": [], "exercises": []}
+
+    # Check lesson content
+    try:
+        # Lessons read from disk load their body lazily; validate all of it
+        lesson_ok = lesson is not None and lesson.content is not None
+    except Exception:
+        lesson_ok = False
+    if not lesson_ok:
+        errors["modules"].append(f"Module {module_id}: Could not load lesson content")
+
+    # Check exercises
+    if not exercises:
+        errors["exercises"].append(f"Module {module_id}: No exercises found")
+
+    # Validate exercise types
+    for exercise in exercises:
+        if exercise.type not in VALID_EXERCISE_TYPES:
+            errors["exercises"].append(
+                f"Module {module_id}, Exercise {exercise.id}: Invalid type '{exercise.type}'"
+            )
+
+    return {"module": module_id, "errors": errors, "exercises": len(exercises)}
+
+
+def check_cross_references(glossary: List[Any], module_ids: List[str]) -> List[str]:
+    """Find glossary entries whose related lessons are not existing modules."""
+    known = set(module_ids)
+    warnings = []
+    for entry in glossary:
+        for lesson_id in entry.related_lessons:
+            if lesson_id not in known:
+                warnings.append(
+                    f"Glossary term '{entry.term}': Related lesson '{lesson_id}' does not exist"
+                )
+    return warnings
+
+
+# One loader per worker process, reused across the modules it checks
+_worker_loaders: Dict[str, Any] = {}
+
+
+def _init_worker() -> None:
+    """Keep worker processes off the content bundle, shared snapshot and invalidation bus.
+
+    Workers import the loader module; its global loader must never open a
+    bundle or publish a snapshot there, since the parent may be building one.
+    """
+    os.environ["CONTENT_BUNDLE_PATH"] = ""
+    os.environ["CONTENT_SNAPSHOT_DIR"] = ""
+    os.environ["CONTENT_INVALIDATION_BUS"] = ""
+
+
+def _check_module_files(content_dir: str, module_id: str) -> Dict[str, Any]:
+    """Worker entry point: parse and check a module from the content directory."""
+    # Imported lazily: the loader itself imports this module
+    from app.core.content_loader import ContentLoader
+
+    loader = _worker_loaders.get(content_dir)
+    if loader is None:
+        loader = _worker_loaders[content_dir] = ContentLoader(content_dir)
+    return check_module(
+        module_id, loader.get_lesson_content(module_id), loader.get_exercises(module_id)
+    )
+
+
+def iter_module_reports(
+    content_dir: str,
+    module_ids: List[str],
+    check_inline: Callable[[str], Dict[str, Any]],
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield a report for every module, in completion order.
+
+    Uses a process pool when there are enough modules to benefit, otherwise
+    checks them in this process with check_inline.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(module_ids))
+    if workers <= 1 or len(module_ids) < PARALLEL_MIN_MODULES:
+        for module_id in module_ids:
+            yield check_inline(module_id)
+        return
+
+    # Spawned workers are safe to start from a threaded server process
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    try:
+        futures = {
+            pool.submit(_check_module_files, content_dir, module_id): module_id
+            for module_id in module_ids
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                module_id = futures[future]
+                yield {
+                    "module": module_id,
+                    "errors": {
+                        "modules": [f"Module {module_id}: Validation failed: {e}"],
+                        "exercises": [],
+                    },
+                    "exercises": 0,
+                }
+    finally:
+        # Drop queued checks if the consumer stops reading early
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# (mtime_ns, size, inode) of a file and the sha256 of its bytes
+FileFingerprint = Tuple[Optional[List[int]], Optional[str]]
+
+
+class ValidationCache:
+    """
+    Validation results persisted between runs, keyed by content hashes.
+
+    A module's cached report is reused while the hashes of its lesson.md and
+    exercises.json match; files whose stat signature is unchanged are not
+    even re-read to be hashed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._modules: Dict[str, Dict[str, Any]] = {}
+        self._cross_references: Dict[str, Any] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == VALIDATION_VERSION:
+                self._modules = data["modules"]
+                self._cross_references = data["cross_references"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            # Missing or unreadable cache: everything is re-checked
+            pass
+
+    @staticmethod
+    def _file_fingerprint(path: Path, previous: Optional[List[Any]]) -> FileFingerprint:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, None
+        signature = [st.st_mtime_ns, st.st_size, st.st_ino]
+        if previous and previous[0] == signature:
+            return signature, previous[1]
+        with open(path, "rb") as f:
+            return signature, hashlib.sha256(f.read()).hexdigest()
+
+    def fingerprint(self, module_dir: Path) -> Dict[str, FileFingerprint]:
+        """Fingerprint a module's source files, reusing hashes of unchanged files."""
+        cached = self._modules.get(module_dir.name, {}).get("files", {})
+        return {
+            name: self._file_fingerprint(module_dir / name, cached.get(name))
+            for name in ("lesson.md", "exercises.json")
+        }
+
+    def lookup(
+        self, module_id: str, files: Dict[str, FileFingerprint]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached report if the module's file hashes still match."""
+        entry = self._modules.get(module_id)
+        if entry is None:
+            return None
+        for name, (_, sha) in files.items():
+            if entry["files"].get(name, [None, None])[1] != sha:
+                return None
+        # Refresh signatures so touched-but-identical files are not re-hashed next time
+        entry["files"] = {
+            name: list(fingerprint) for name, fingerprint in files.items()
+        }
+        return entry["report"]
+
+    def store(
+        self, module_id: str, files: Dict[str, FileFingerprint], report: Dict[str, Any]
+    ) -> None:
+        self._modules[module_id] = {
+            "files": {name: list(fingerprint) for name, fingerprint in files.items()},
+            "report": report,
+        }
+
+    def cross_references(self, key: str) -> Optional[List[str]]:
+        """Cached cross-reference warnings for a glossary hash and module set."""
+        if self._cross_references.get("key") == key:
+            return self._cross_references["warnings"]
+        return None
+
+    def store_cross_references(self, key: str, warnings: List[str]) -> None:
+        self._cross_references = {"key": key, "warnings": warnings}
+
+    def save(self, module_ids: List[str]) -> None:
+        """Write the cache atomically, dropping modules that no longer exist."""
+        keep = set(module_ids)
+        data = {
+            "version": VALIDATION_VERSION,
+            "modules": {
+                module_id: entry
+                for module_id, entry in self._modules.items()
+                if module_id in keep
+            },
+            "cross_references": self._cross_references,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving validation cache: {e}")
@@ -0,0 +1,40 @@
+"""
+Search index upkeep for lessons stored in the database.
+
+Database lessons share the content loader's search index with the file
+content under the "db" source. The lessons endpoints keep it current as
+lessons are written; a write that fails to index is logged, never turned
+into a failed request, and repaired by the next sync.
+"""
+from typing import Any, Dict, Tuple
+from app.core.content_loader import content_loader
+from app.core.lesson_search import markdown_to_text
+
+
+def db_version(lesson: Any) -> Any:
+    """When a database lesson last changed, the version it is indexed at."""
+    # Rows written before updated_at existed fall back to their creation time
+    return lesson.updated_at or lesson.created_at
+
+
+def db_document(lesson: Any) -> Tuple[Tuple[str, str], Any, str, str, Dict[str, Any]]:
+    """Doc id, version, title, plain text and fields for a database lesson."""
+    fields = {"source": "db", "type": "lesson", "module_id": str(lesson.module_id)}
+    return ("db", str(lesson.id)), db_version(lesson), lesson.title, markdown_to_text(lesson.content), fields
+
+
+def index_db_lesson(lesson: Any) -> None:
+    """Re-index a database lesson after it was created or updated."""
+    try:
+        doc_id, version, title, text, fields = db_document(lesson)
+        content_loader.search_index.add(doc_id, title, text, version, **fields)
+    except Exception as e:
+        print(f"Error indexing lesson {lesson.id}: {e}")
+
+
+def remove_db_lesson(lesson_id: Any) -> None:
+    """Drop a deleted database lesson from the search index."""
+    try:
+        content_loader.search_index.remove(("db", str(lesson_id)))
+    except Exception as e:
+        print(f"Error removing lesson {lesson_id} from the search index: {e}")
@@ -0,0 +1,59 @@
+"""
+Global lookup index over content exercises.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+class IndexedExercise(NamedTuple):
+    """An exercise together with the module it belongs to."""
+    module_id: str
+    exercise: Any
+    content_id: str
+
+
+def exercise_content_id(module_id: str, exercise: Any) -> str:
+    """Stable id derived from the module and the exercise's full content."""
+    payload = json.dumps(
+        {"module": module_id, "exercise": exercise.model_dump()},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ExerciseIndex:
+    """Constant-time exercise lookups across all modules for one content version."""
+
+    def __init__(self, version: int):
+        self.version = version
+        self._by_key: Dict[Tuple[str, str], IndexedExercise] = {}
+        self._by_content_id: Dict[str, IndexedExercise] = {}
+        self._by_exercise_id: Dict[str, List[IndexedExercise]] = {}
+
+    def add(self, module_id: str, exercises: List[Any]) -> None:
+        for exercise in exercises:
+            record = IndexedExercise(module_id, exercise, exercise_content_id(module_id, exercise))
+            self._by_key[(module_id, exercise.id)] = record
+            self._by_content_id[record.content_id] = record
+            self._by_exercise_id.setdefault(exercise.id, []).append(record)
+
+    def get(self, module_id: str, exercise_id: str) -> Optional[IndexedExercise]:
+        return self._by_key.get((module_id, exercise_id))
+
+    def find(self, exercise_id: str) -> Optional[IndexedExercise]:
+        """
+        Look up an exercise without knowing its module.
+
+        Accepts a content id, or a plain exercise id when exactly one module
+        defines it.
+        """
+        record = self._by_content_id.get(exercise_id)
+        if record is not None:
+            return record
+        records = self._by_exercise_id.get(exercise_id, [])
+        return records[0] if len(records) == 1 else None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
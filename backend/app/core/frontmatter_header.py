@@ -0,0 +1,72 @@
+"""
+Header-only frontmatter parsing for lesson files.
+
+Reads a lesson file only up to its closing ``---`` delimiter so listings and
+metadata lookups do not pay for reading lesson bodies. Results match what
+python-frontmatter returns for the same file.
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, NamedTuple
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+BOUNDARY_RE = re.compile(rb"-{3,}\s*$")
+
+
+class FrontmatterHeader(NamedTuple):
+    """Parsed frontmatter and where the body starts."""
+    metadata: Dict[str, Any]
+    # Decoded text of everything before the body
+    text: str
+    body_offset: int
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes the way text-mode reads do (universal newlines)."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_header(path: Path) -> FrontmatterHeader:
+    """
+    Read a file's YAML frontmatter without reading its body.
+
+    Files without a frontmatter block (or without a closing delimiter) yield
+    empty metadata and a body that starts at the first non-blank line.
+    """
+    with open(path, "rb") as f:
+        consumed = b""
+        line = f.readline()
+        while line and not line.strip():
+            consumed += line
+            line = f.readline()
+
+        if not BOUNDARY_RE.match(line.lstrip()):
+            return FrontmatterHeader({}, decode_text(consumed), len(consumed))
+
+        block = []
+        header = line
+        while True:
+            line = f.readline()
+            if not line:
+                # Unterminated block: python-frontmatter treats it all as body
+                return FrontmatterHeader({}, decode_text(consumed), len(consumed))
+            header += line
+            if BOUNDARY_RE.match(line):
+                break
+            block.append(line)
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    metadata = yaml.load(decode_text(b"".join(block)), Loader=loader)
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return FrontmatterHeader(metadata, decode_text(consumed + header), len(consumed) + len(header))
+
+
+def read_body(path: Path, offset: int) -> str:
+    """Read the text of a file from a body offset returned by read_header."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return decode_text(f.read())
@@ -0,0 +1,293 @@
+"""
+Search indexes over glossary entries.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Field weights: a match in the term outranks the definition, which
+# outranks the examples.
+TERM_WEIGHT = 4
+DEFINITION_WEIGHT = 2
+EXAMPLE_WEIGHT = 1
+
+# Number of precomputed suggestions kept per prefix
+SUGGEST_MAX = 10
+
+# Largest number of typos corrected per word; shorter words allow fewer
+MAX_EDIT_DISTANCE = 2
+# Words shorter than this are never corrected ("is" -> "it" is not a typo fix)
+FUZZY_MIN_LENGTH = 3
+# Alternative corrections tried per misspelled word after the best one
+FUZZY_ALTERNATIVES = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class PrefixTrie:
+    """Character trie mapping every inserted key to its subtree."""
+
+    def __init__(self) -> None:
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, key: str) -> None:
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = key
+
+    def _find(self, prefix: str) -> Optional[Dict[str, Any]]:
+        node: Dict[str, Any] = self._root
+        for char in prefix:
+            child = node.get(char)
+            if child is None:
+                return None
+            node = child
+        return node
+
+    def keys_with_prefix(self, prefix: str) -> Iterator[str]:
+        """Yield every inserted key starting with prefix."""
+        node = self._find(prefix)
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == "":
+                    yield child
+                else:
+                    stack.append(child)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between a and b.
+
+    Insertions, deletions, substitutions and swaps of adjacent characters
+    each count as one edit. Returns max_distance + 1 as soon as the distance
+    is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous: List[int] = []
+    current = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+    return min(current[-1], max_distance + 1)
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """The word and every string made by deleting up to max_distance characters."""
+    variants = {word}
+    edge = {word}
+    for _ in range(max_distance):
+        edge = {variant[:i] + variant[i + 1:] for variant in edge for i in range(len(variant))}
+        variants |= edge
+    return variants
+
+
+def max_edits(word: str) -> int:
+    """Typos tolerated in a word of this length."""
+    if len(word) < FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(word) <= 4 else MAX_EDIT_DISTANCE
+
+
+class SymSpell:
+    """
+    Symmetric-delete spelling index.
+
+    Every vocabulary word is stored under each string obtained by deleting
+    up to max_distance of its characters. A lookup generates the same
+    deletes of the query, so candidate corrections come from a few dict
+    lookups and only those candidates are checked with edit_distance.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.words: Set[str] = set(words)
+        self._deletes: Dict[str, List[str]] = {}
+        for word in self.words:
+            for variant in _deletes(word, max_distance):
+                self._deletes.setdefault(variant, []).append(word)
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Return (vocabulary word, distance) pairs within max_distance, closest first."""
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        candidates: Set[str] = set()
+        for variant in _deletes(word, max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+
+class GlossaryIndex:
+    """Tokenized inverted index with prefix lookup over glossary entries."""
+
+    def __init__(self, entries: Sequence[Any]):
+        self.entries = list(entries)
+        # token -> {entry position: best field weight}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._trie = PrefixTrie()
+        self._terms = [entry.term.lower() for entry in self.entries]
+
+        for position, entry in enumerate(self.entries):
+            self._add(position, entry.term, TERM_WEIGHT)
+            self._add(position, entry.definition, DEFINITION_WEIGHT)
+            for example in entry.examples:
+                self._add(position, example, EXAMPLE_WEIGHT)
+
+        self._suggestions = self._build_suggestions()
+
+        # Typo-tolerant vocabulary: words of terms and examples, with term
+        # words preferred when corrections are equally close
+        self._term_words: Set[str] = set()
+        examples: Set[str] = set()
+        for entry in self.entries:
+            self._term_words.update(tokenize(entry.term))
+            for example in entry.examples:
+                examples.update(tokenize(example))
+        self._spelling = SymSpell(self._term_words | examples)
+
+        # Case-folded hash lookups for exact term and category access
+        self.by_term: Dict[str, Any] = {}
+        self.by_category: Dict[str, List[Any]] = {}
+        for entry in self.entries:
+            self.by_term.setdefault(entry.term.casefold(), entry)
+            self.by_category.setdefault(entry.category.casefold(), []).append(entry)
+        self.categories = sorted(set(entry.category for entry in self.entries))
+
+    def _build_suggestions(self) -> Dict[str, List[str]]:
+        """
+        Precompute the top suggestions for every prefix of every term.
+
+        A term is reachable from the start of the term and from the start of
+        each later word ("sent" suggests "Run-on Sentence"). Whole-term
+        prefix matches rank above inner-word matches, then shorter terms first.
+        """
+        candidates: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            words = tokenize(entry.term)
+            for start in range(len(words)):
+                key = " ".join(words[start:])
+                rank = (start > 0, len(entry.term), entry.term.lower())
+                for end in range(1, len(key) + 1):
+                    best = candidates.setdefault(key[:end], {})
+                    if entry.term not in best or rank < best[entry.term]:
+                        best[entry.term] = rank
+
+        return {
+            prefix: sorted(ranks, key=ranks.__getitem__)[:SUGGEST_MAX]
+            for prefix, ranks in candidates.items()
+        }
+
+    def _add(self, position: int, text: str, weight: int) -> None:
+        for token in tokenize(text):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._trie.insert(token)
+            if postings.get(position, 0) < weight:
+                postings[position] = weight
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_MAX) -> List[str]:
+        """Return up to limit glossary terms completing prefix."""
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+        return self._suggestions.get(key, [])[:limit]
+
+    def _match(self, query_token: str) -> Dict[int, int]:
+        """Best field weight per entry for any token starting with query_token."""
+        matches: Dict[int, int] = {}
+        for token in self._trie.keys_with_prefix(query_token):
+            for position, weight in self._postings[token].items():
+                if matches.get(position, 0) < weight:
+                    matches[position] = weight
+        return matches
+
+    def search(self, query: str) -> List[Any]:
+        """
+        Return entries matching every query token as a word prefix.
+
+        Results are ranked by field weight (term, then definition, then
+        examples) with exact term matches first; ties keep glossary order.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        scores: Dict[int, int] = {}
+        for i, query_token in enumerate(query_tokens):
+            matches = self._match(query_token)
+            if i == 0:
+                scores = matches
+            else:
+                scores = {
+                    position: score + matches[position]
+                    for position, score in scores.items()
+                    if position in matches
+                }
+            if not scores:
+                return []
+
+        query_lower = query.strip().lower()
+        ranked = sorted(
+            scores,
+            key=lambda position: (
+                self._terms[position] != query_lower,
+                -scores[position],
+                position,
+            ),
+        )
+        return [self.entries[position] for position in ranked]
+
+    def _corrections(self, token: str) -> List[str]:
+        """Vocabulary words a query token may be a misspelling of, best first."""
+        if token in self._spelling.words:
+            return [token]
+        matches = self._spelling.lookup(token, max_edits(token))
+        matches.sort(key=lambda match: (match[1], match[0] not in self._term_words, match[0]))
+        return [word for word, _ in matches]
+
+    def fuzzy_search(self, query: str) -> Tuple[Optional[str], List[Any]]:
+        """
+        Search again with misspelled query words corrected.
+
+        Returns the corrected query ("did you mean") and the entries it
+        matches, followed by entries matched by the next-closest
+        corrections. Returns (None, []) if some word has no correction.
+        """
+        options = [self._corrections(token) for token in tokenize(query)]
+        if not options or not all(options):
+            return None, []
+
+        corrected = [words[0] for words in options]
+        results = self.search(" ".join(corrected))
+        seen = {id(entry) for entry in results}
+        for position, words in enumerate(options):
+            for word in words[1:1 + FUZZY_ALTERNATIVES]:
+                alternative = corrected[:position] + [word] + corrected[position + 1:]
+                for entry in self.search(" ".join(alternative)):
+                    if id(entry) not in seen:
+                        seen.add(id(entry))
+                        results.append(entry)
+        return " ".join(corrected), results
@@ -0,0 +1,159 @@
+"""
+Glossary term auto-linking for lessons.
+
+All glossary terms are compiled into one Aho-Corasick automaton, so a lesson
+is scanned for every term in a single pass regardless of glossary size.
+"""
+import re
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Plural forms that still link to the singular term
+TERM_SUFFIXES = ("", "s", "es")
+
+# Elements whose text is never linked
+NO_LINK_ELEMENTS = {"a", "code", "pre", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Markdown that must not be linked: fenced code, inline code, headings, links
+MARKDOWN_SKIP_RE = re.compile(
+    r"^ {0,3}(`{3,}|~{3,}).*?(?:^ {0,3}\1[ \t]*$|\Z)"
+    r"|`+[^`\n]*`+"
+    r"|^ {0,3}#{1,6}[ \t][^\n]*"
+    r"|!?\[[^\]\n]*\]\([^)\n]*\)",
+    re.MULTILINE | re.DOTALL,
+)
+
+Match = Tuple[int, int, str]
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing length, so offsets map back to the original text."""
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher."""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (pattern length, value) for every pattern ending at a state
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), value))
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) for every pattern occurrence, overlapping ones included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i + 1 - length, i + 1, value
+
+
+class GlossaryLinker:
+    """Finds glossary terms in lesson text for one glossary version."""
+
+    def __init__(self, terms: List[str], version: Optional[str] = None):
+        self.version = version
+        patterns: Dict[str, str] = {}
+        for term in terms:
+            for suffix in TERM_SUFFIXES:
+                patterns.setdefault(_fold(term + suffix), term)
+        self._automaton = AhoCorasick(patterns)
+
+    def find(self, text: str) -> List[Match]:
+        """Whole-word, case-insensitive, non-overlapping matches, longest first at each position."""
+        matches = [
+            (start, end, term)
+            for start, end, term in self._automaton.iter_matches(_fold(text))
+            if (start == 0 or not text[start - 1].isalnum())
+            and (end == len(text) or not text[end].isalnum())
+        ]
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected: List[Match] = []
+        last_end = 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+    def find_in_markdown(self, text: str) -> List[Match]:
+        """Matches in markdown source, skipping code, headings and existing links."""
+        masked = MARKDOWN_SKIP_RE.sub(lambda m: re.sub(r"[^\n]", " ", m.group(0)), text)
+        return self.find(masked)
+
+    def link_ast(self, ast: List[Any], href: Callable[[str], str]) -> List[Any]:
+        """Copy of a lesson AST with glossary terms wrapped in links."""
+        def link(node: Any, linkable: bool) -> List[Any]:
+            if isinstance(node, str):
+                if not linkable:
+                    return [node]
+                parts: List[Any] = []
+                pos = 0
+                for start, end, term in self.find(node):
+                    if start > pos:
+                        parts.append(node[pos:start])
+                    parts.append({
+                        "type": "a",
+                        "attrs": {"class": "glossary-term", "href": href(term), "data-term": term},
+                        "children": [node[start:end]],
+                    })
+                    pos = end
+                if pos < len(node):
+                    parts.append(node[pos:])
+                return parts
+            if "children" not in node:
+                return [node]
+            child_linkable = linkable and node["type"] not in NO_LINK_ELEMENTS
+            children = [part for child in node["children"] for part in link(child, child_linkable)]
+            return [dict(node, children=children)]
+
+        return [part for block in ast for part in link(block, True)]
+
+
+class LinkedLesson:
+    """A rendered lesson with glossary terms linked, plus term spans in its markdown."""
+
+    __slots__ = ("ast", "html", "spans")
+
+    def __init__(self, ast: List[Any], html: str, spans: List[Dict[str, Any]]):
+        self.ast = ast
+        self.html = html
+        self.spans = spans
+
+    @property
+    def size(self) -> int:
+        return len(self.html) * 2 + 48 * len(self.spans)
@@ -0,0 +1,353 @@
+"""
+Cross-worker content invalidation.
+
+Every uvicorn/gunicorn worker holds its own content caches. When one worker
+clears or reloads content, it broadcasts the version bump on this bus; every
+other worker reloads incrementally and acknowledges, so the caller can see
+how many workers have picked up the change.
+
+Backends:
+
+- ``FileBus``: a shared directory with an event log, an ack log and one
+  heartbeat file per worker. For development and single-host setups. The logs
+  are append-only between compactions, which drop entries older than
+  WORKER_TTL once a log outgrows MAX_LOG_BYTES.
+- ``PostgresBus``: LISTEN/NOTIFY on the application database, for production.
+"""
+import json
+import os
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from app.core.config import settings
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+Message = Dict[str, Any]
+Handler = Callable[[Message], Any]
+# (inode, offset) read up to in a file bus log
+LogPosition = Tuple[Optional[int], int]
+
+# Seconds between checks for new events (file bus) or listener wake-ups
+POLL_INTERVAL = 0.5
+# A worker whose heartbeat is older than this is considered gone
+WORKER_TTL = 10.0
+# How long a broadcast waits for acknowledgements
+ACK_TIMEOUT = 2.0
+# File bus logs are compacted once larger than this; entries older than
+# WORKER_TTL are dropped, every live worker has read them by then
+MAX_LOG_BYTES = 64 * 1024
+
+
+class InvalidationBus(ABC):
+    """Broadcasts content version bumps and counts acknowledging workers."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL, ack_timeout: float = ACK_TIMEOUT):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.ack_timeout = ack_timeout
+        self._handler: Optional[Handler] = None
+        self._stopping = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and self._listener.is_alive()
+
+    def start(self, handler: Handler) -> None:
+        """Call handler for every message broadcast by other workers, on a background thread."""
+        if self.listening:
+            return
+        self._handler = handler
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen, name="content-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=self.poll_interval * 4)
+            self._listener = None
+
+    def broadcast(self, event: str, version: Optional[int] = None) -> int:
+        """
+        Tell every other worker to reload content.
+
+        Blocks until all live workers acknowledged or ack_timeout passed, and
+        returns the number of workers that acknowledged.
+        """
+        message = {"id": uuid.uuid4().hex, "event": event, "version": version, "sender": self.worker_id}
+        return self._broadcast(message)
+
+    def _deliver(self, message: Message) -> bool:
+        """Hand a message from another worker to the handler; True if it should be acknowledged."""
+        if message.get("sender") == self.worker_id or self._handler is None:
+            return False
+        try:
+            self._handler(message)
+        except Exception as e:
+            print(f"Error handling content invalidation {message.get('event')}: {e}")
+            return False
+        return True
+
+    @abstractmethod
+    def _listen(self) -> None:
+        """Deliver messages from other workers until stop() is called."""
+
+    @abstractmethod
+    def _broadcast(self, message: Message) -> int:
+        """Send message to every other worker and return how many acknowledged."""
+
+
+class FileBus(InvalidationBus):
+    """Invalidation bus over a directory shared by the workers."""
+
+    def __init__(self, directory: str, max_log_bytes: int = MAX_LOG_BYTES, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.max_log_bytes = max_log_bytes
+        self._events = self.directory / "events.log"
+        self._acks = self.directory / "acks.log"
+        self._workers = self.directory / "workers"
+
+    def _append(self, path: Path, message: Message) -> None:
+        line = (json.dumps(dict(message, time=time.time())) + "\n").encode("utf-8")
+        while True:
+            with open(path, "ab") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # A compaction replaced the log while this writer waited
+                    if os.fstat(f.fileno()).st_ino != self._position(path)[0]:
+                        continue
+                    f.write(line)
+                    f.flush()
+                    if f.tell() > self.max_log_bytes:
+                        self._compact(path)
+                    return
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _compact(path: Path) -> None:
+        """Rewrite a log without entries older than WORKER_TTL; called under its lock."""
+        cutoff = time.time() - WORKER_TTL
+        kept = []
+        for line in path.read_bytes().splitlines(keepends=True):
+            try:
+                if json.loads(line).get("time", 0) >= cutoff:
+                    kept.append(line)
+            except ValueError:
+                continue
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(b"".join(kept))
+        # Readers notice the new inode and start over from its beginning
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _position(path: Path) -> LogPosition:
+        """The end of a log, where reading only new entries starts."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    @staticmethod
+    def _read_from(path: Path, position: LogPosition) -> Tuple[List[Message], LogPosition]:
+        """
+        Complete lines appended to a log since position, and the new position.
+
+        After a compaction the whole log is read again, so callers must
+        skip entries they have already seen.
+        """
+        inode, offset = position
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != inode or stat.st_size < offset:
+                    offset = 0
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], position
+        # A line still being written is picked up on the next read
+        end = data.rfind(b"\n") + 1
+        messages = []
+        for line in data[:end].splitlines():
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                continue
+        return messages, (stat.st_ino, offset + end)
+
+    def _heartbeat(self) -> None:
+        (self._workers / self.worker_id).touch()
+
+    def live_workers(self) -> int:
+        """Workers other than this one with a recent heartbeat."""
+        now = time.time()
+        count = 0
+        for path in self._workers.glob("*"):
+            if path.name == self.worker_id:
+                continue
+            try:
+                if now - path.stat().st_mtime < WORKER_TTL:
+                    count += 1
+            except FileNotFoundError:
+                continue
+        return count
+
+    def _listen(self) -> None:
+        self._workers.mkdir(parents=True, exist_ok=True)
+        # Only events broadcast after this worker started concern it
+        position = self._position(self._events)
+        # Event ids already handled, to skip entries a compaction left in place
+        seen: Dict[str, float] = {}
+        try:
+            while not self._stopping.is_set():
+                self._heartbeat()
+                messages, position = self._read_from(self._events, position)
+                now = time.time()
+                for message in messages:
+                    event_id = str(message.get("id"))
+                    if event_id in seen:
+                        continue
+                    seen[event_id] = now
+                    if self._deliver(message):
+                        self._append(self._acks, {"id": message["id"], "worker": self.worker_id})
+                for event_id, handled in list(seen.items()):
+                    if now - handled > 2 * WORKER_TTL:
+                        del seen[event_id]
+                self._stopping.wait(self.poll_interval)
+        finally:
+            (self._workers / self.worker_id).unlink(missing_ok=True)
+
+    def _broadcast(self, message: Message) -> int:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._workers.mkdir(exist_ok=True)
+        position = self._position(self._acks)
+        expected = self.live_workers()
+        self._append(self._events, message)
+
+        acked: Set[str] = set()
+        deadline = time.monotonic() + self.ack_timeout
+        while len(acked) < expected and time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, 0.05))
+            acks, position = self._read_from(self._acks, position)
+            acked.update(ack["worker"] for ack in acks if ack.get("id") == message["id"])
+        return len(acked)
+
+
+class PostgresBus(InvalidationBus):
+    """Invalidation bus over PostgreSQL LISTEN/NOTIFY."""
+
+    CHANNEL = "content_invalidation"
+    ACK_CHANNEL = "content_invalidation_ack"
+    # Listener connections are tagged so broadcasts know how many acks to expect
+    APPLICATION_NAME = "grammar-anatomy-content-bus"
+
+    def __init__(self, dsn: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        if psycopg2 is None:
+            raise RuntimeError("psycopg2 is not installed")
+        # SQLAlchemy URLs may name a driver ("postgresql+psycopg2://")
+        self.dsn = re.sub(r"^postgres(?:ql)?(?:\+\w+)?://", "postgresql://", dsn)
+
+    def _connect(self, application_name: Optional[str] = None) -> Any:
+        kwargs = {"application_name": application_name} if application_name else {}
+        conn = psycopg2.connect(self.dsn, **kwargs)
+        conn.autocommit = True
+        return conn
+
+    def _notifies(self, conn: Any, timeout: float) -> Iterator[Message]:
+        """Notifications received on conn within timeout."""
+        if select.select([conn], [], [], timeout) == ([], [], []):
+            return
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                yield json.loads(notify.payload)
+            except ValueError:
+                continue
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect(self.APPLICATION_NAME)
+            except psycopg2.Error as e:
+                print(f"Content invalidation listener cannot connect: {e}")
+                self._stopping.wait(WORKER_TTL)
+                continue
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.CHANNEL}")
+                    while not self._stopping.is_set():
+                        for message in self._notifies(conn, self.poll_interval):
+                            if self._deliver(message):
+                                ack = json.dumps({"id": message["id"], "worker": self.worker_id})
+                                cur.execute("SELECT pg_notify(%s, %s)", (self.ACK_CHANNEL, ack))
+            except psycopg2.Error as e:
+                # Reconnect; events broadcast while disconnected are missed,
+                # but the periodic content refresh still catches them up
+                print(f"Content invalidation listener lost its connection: {e}")
+            finally:
+                conn.close()
+
+    def _broadcast(self, message: Message) -> int:
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.ACK_CHANNEL}")
+                cur.execute(
+                    "SELECT count(*) FROM pg_stat_activity WHERE application_name = %s",
+                    (self.APPLICATION_NAME,)
+                )
+                expected = cur.fetchone()[0] - (1 if self.listening else 0)
+                cur.execute("SELECT pg_notify(%s, %s)", (self.CHANNEL, json.dumps(message)))
+
+            acked: Set[str] = set()
+            deadline = time.monotonic() + self.ack_timeout
+            while len(acked) < expected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                acked.update(
+                    ack["worker"] for ack in self._notifies(conn, remaining)
+                    if ack.get("id") == message["id"]
+                )
+            return len(acked)
+        finally:
+            conn.close()
+
+
+def create_bus(url: str, **kwargs: Any) -> Optional[InvalidationBus]:
+    """
+    Build the bus named by a setting value.
+
+    ``postgresql://...`` uses LISTEN/NOTIFY, ``file:///path`` or a plain path
+    uses a shared directory, and an empty value disables the bus.
+    """
+    if not url:
+        return None
+    if re.match(r"^postgres(?:ql)?(?:\+\w+)?://", url):
+        return PostgresBus(url, **kwargs)
+    return FileBus(url[len("file://"):] if url.startswith("file://") else url, **kwargs)
+
+
+# Global bus instance; None when cross-worker invalidation is disabled
+invalidation_bus = create_bus(settings.CONTENT_INVALIDATION_BUS)
@@ -0,0 +1,164 @@
+"""
+Server-side rendering of lesson markdown.
+
+Lessons are rendered once per content version into sanitized HTML and a JSON
+AST with a table of contents, so clients do not have to parse markdown.
+"""
+import html
+import re
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+from xml.etree.ElementTree import Element
+try:
+    import markdown
+    from markdown.extensions import Extension
+    from markdown.treeprocessors import Treeprocessor
+    from markdown.util import AMP_SUBSTITUTE, HTML_PLACEHOLDER_RE
+except ImportError:
+    markdown = None
+    Extension = Treeprocessor = object
+
+# No attr_list or md_in_html: both let authors inject arbitrary attributes or HTML
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists", "toc"]
+
+# Link and image URL schemes allowed through; relative URLs are always kept
+SAFE_URL_SCHEMES = {"", "http", "https", "mailto"}
+URL_ATTRIBUTES = {"a": "href", "img": "src"}
+CONTROL_CHARS_RE = re.compile(r"[\x00-\x20\x7f]+")
+
+
+def is_safe_url(url: str) -> bool:
+    """Check a link target against the allowed URL schemes."""
+    try:
+        scheme = urlsplit(CONTROL_CHARS_RE.sub("", url)).scheme
+    except ValueError:
+        return False
+    return scheme.lower() in SAFE_URL_SCHEMES
+
+
+class _SanitizeTreeprocessor(Treeprocessor):
+    """Drop link and image URLs with unsafe schemes such as javascript:."""
+
+    def run(self, root: Element) -> None:
+        for element in root.iter():
+            attribute = URL_ATTRIBUTES.get(element.tag)
+            if attribute is None:
+                continue
+            # Check the URL as browsers will see it: "&#106;avascript:" is javascript:
+            url = html.unescape(element.get(attribute, "").replace(AMP_SUBSTITUTE, "&"))
+            if not is_safe_url(url):
+                del element.attrib[attribute]
+
+
+class _CaptureTreeprocessor(Treeprocessor):
+    """Convert the final element tree into a JSON-serializable AST."""
+
+    def run(self, root: Element) -> None:
+        self.md.lesson_ast = [self._node(child) for child in root]
+
+    def _text(self, text: str) -> str:
+        # Entities and obfuscated e-mail links are only expanded at serialization
+        text = HTML_PLACEHOLDER_RE.sub(
+            lambda m: html.unescape(self.md.htmlStash.rawHtmlBlocks[int(m.group(1))]),
+            text
+        )
+        if AMP_SUBSTITUTE in text:
+            text = html.unescape(text.replace(AMP_SUBSTITUTE, "&"))
+        return text
+
+    @staticmethod
+    def _keep(text: str) -> bool:
+        # Newlines between block elements are pretty-printing, not content
+        return bool(text) and not (text.isspace() and "\n" in text)
+
+    def _node(self, element: Element) -> Dict[str, Any]:
+        children: List[Any] = []
+        if element.text and self._keep(element.text):
+            children.append(self._text(element.text))
+        for child in element:
+            children.append(self._node(child))
+            if child.tail and self._keep(child.tail):
+                children.append(self._text(child.tail))
+        node: Dict[str, Any] = {"type": element.tag}
+        if element.attrib:
+            node["attrs"] = {name: self._text(value) for name, value in element.attrib.items()}
+        if children:
+            node["children"] = children
+        return node
+
+
+class _LessonExtension(Extension):
+    """Escape raw HTML, sanitize URLs and capture the AST."""
+
+    def extendMarkdown(self, md: "markdown.Markdown") -> None:
+        # Raw HTML in lessons is rendered as text instead of passed through
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_SanitizeTreeprocessor(md), "sanitize", 1)
+        # After "unescape" (priority 0) has restored backslash-escaped characters
+        md.treeprocessors.register(_CaptureTreeprocessor(md), "capture_ast", -1)
+
+
+class RenderedLesson:
+    """Sanitized HTML, JSON AST, headings and table of contents for one lesson."""
+
+    __slots__ = ("html", "ast", "toc", "headings")
+
+    def __init__(self, html: str, ast: List[Any], toc: List[Dict[str, Any]], headings: List[Dict[str, Any]]):
+        self.html = html
+        self.ast = ast
+        self.toc = toc
+        self.headings = headings
+
+    @property
+    def size(self) -> int:
+        return len(self.html) * 2 + sum(len(heading["title"]) for heading in self.headings)
+
+
+def _toc(tokens: List[Dict[str, Any]], headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Nested table of contents from markdown's toc tokens; also collects a flat list."""
+    toc = []
+    for token in tokens:
+        heading = {"level": token["level"], "id": token["id"], "title": html.unescape(token["name"])}
+        headings.append(heading)
+        toc.append(dict(heading, children=_toc(token["children"], headings)))
+    return toc
+
+
+def render_lesson(text: str) -> RenderedLesson:
+    """Render lesson markdown to sanitized HTML plus a JSON AST and table of contents."""
+    if markdown is None:
+        raise RuntimeError("markdown is not installed")
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS + [_LessonExtension()])
+    body = md.convert(text)
+    headings: List[Dict[str, Any]] = []
+    toc = _toc(md.toc_tokens, headings)
+    return RenderedLesson(body, md.lesson_ast, toc, headings)
+
+
+VOID_ELEMENTS = {"br", "hr", "img"}
+
+
+def ast_to_html(ast: List[Any]) -> str:
+    """Serialize a lesson AST (as produced by render_lesson) back to HTML."""
+    parts: List[str] = []
+
+    def write(node: Any) -> None:
+        if isinstance(node, str):
+            parts.append(html.escape(node, quote=False))
+            return
+        parts.append("<" + node["type"])
+        for name, value in node.get("attrs", {}).items():
+            parts.append(f' {name}="{html.escape(value)}"')
+        if node["type"] in VOID_ELEMENTS:
+            parts.append(" />")
+            return
+        parts.append(">")
+        for child in node.get("children", []):
+            write(child)
+        parts.append(f"</{node['type']}>")
+
+    for block in ast:
+        write(block)
+        parts.append("\n")
+    return "".join(parts).rstrip("\n")
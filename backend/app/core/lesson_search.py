@@ -0,0 +1,375 @@
+"""
+BM25 full-text search over lessons, exercises and glossary entries.
+
+Documents are reduced to plain text, tokenized and stemmed into an inverted
+index that is updated one document at a time, so a changed lesson only
+re-indexes itself. Scores use the live document count and average length,
+which keeps them exact across incremental updates.
+"""
+import html
+import math
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+WORD_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# Suffix rules tried in order; the first whose remaining stem is long enough wins
+STEM_RULES = [
+    ("sses", "ss"), ("ies", "y"), ("ied", "y"), ("xes", "x"), ("ches", "ch"), ("shes", "sh"), ("zes", "z"),
+    ("ness", ""), ("ing", ""), ("ly", ""), ("ed", ""), ("s", ""),
+]
+STEM_MIN_LENGTH = 3
+
+# BM25 parameters: term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title words count this many times towards a lesson's term frequencies
+TITLE_WEIGHT = 3
+# Reciprocal rank fusion constant: higher values flatten the rank bonus
+RRF_K = 60
+
+# Approximate length of a highlighted snippet, in characters
+SNIPPET_CHARS = 160
+SNIPPET_CONTEXT = 30
+
+MARKDOWN_RULES = [
+    (re.compile(r"^\s*(`{3,}|~{3,}).*$", re.MULTILINE), ""),
+    (re.compile(r"!?\[([^\]]*)\]\([^)]*\)"), r"\1"),
+    (re.compile(r"^\s{0,3}(#{1,6}|>+)\s*", re.MULTILINE), ""),
+    (re.compile(r"^\s*([-+*]|\d+[.)])\s+", re.MULTILINE), ""),
+    (re.compile(r"^[\s|:-]+$", re.MULTILINE), ""),
+    (re.compile(r"[*`|]+|(?<!\w)_+|_+(?!\w)"), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def stem(word: str) -> str:
+    """Reduce a lowercase word to its stem with light suffix stripping."""
+    if len(word) <= STEM_MIN_LENGTH or word.isdigit():
+        return word
+    for suffix, replacement in STEM_RULES:
+        if not word.endswith(suffix) or len(word) - len(suffix) < STEM_MIN_LENGTH:
+            continue
+        if suffix == "s" and word[-2] in "siu":
+            # "class", "focus", "analysis" are not plurals
+            break
+        word = word[:-len(suffix)] + replacement
+        if suffix in ("ing", "ed") and word[-1] == word[-2] and word[-1] not in "aeiouylsz":
+            # "running" -> "run"
+            word = word[:-1]
+        break
+    if word.endswith("e") and len(word) > STEM_MIN_LENGTH:
+        # "phrase" and "phrases" both become "phras"
+        word = word[:-1]
+    return word
+
+
+def analyze(text: str) -> List[str]:
+    """Split text into stemmed index terms, dropping stopwords."""
+    terms = []
+    for match in WORD_RE.finditer(text):
+        word = match.group().lower()
+        if word not in STOPWORDS:
+            terms.append(stem(word))
+    return terms
+
+
+def markdown_to_text(text: str) -> str:
+    """Strip markdown syntax, leaving the words a reader sees on one line."""
+    for pattern, replacement in MARKDOWN_RULES:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def highlight(text: str, terms: Set[str], length: int = SNIPPET_CHARS) -> str:
+    """
+    Cut the passage of text richest in query terms and mark each match.
+
+    The snippet is HTML-escaped with matches wrapped in ``<mark>``; an
+    ellipsis shows where it was cut.
+    """
+    matches = [
+        match.span() for match in WORD_RE.finditer(text)
+        if stem(match.group().lower()) in terms
+    ]
+
+    # Window starting at the match that covers the most distinct terms
+    start = 0
+    best: Tuple[int, int] = (0, 0)
+    for i, (first, _) in enumerate(matches):
+        window = [span for span in matches[i:] if span[1] <= first + length]
+        distinct = len({stem(text[s:e].lower()) for s, e in window})
+        if (distinct, len(window)) > best:
+            best = (distinct, len(window))
+            start = first if window[-1][1] > length else 0
+    if start > SNIPPET_CONTEXT:
+        start = text.find(" ", start - SNIPPET_CONTEXT, start) + 1 or start
+    else:
+        start = 0
+    end = start + length
+    if end < len(text):
+        end = text.rfind(" ", start, end) if " " in text[start:end] else end
+    else:
+        end = len(text)
+
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for s, e in matches:
+        if s < start or e > end:
+            continue
+        parts.append(html.escape(text[position:s], quote=False))
+        parts.append(f"<mark>{html.escape(text[s:e], quote=False)}</mark>")
+        position = e
+    parts.append(html.escape(text[position:end], quote=False))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
+
+
+class SearchHit(NamedTuple):
+    """One ranked search result."""
+    doc_id: Hashable
+    score: float
+    title: str
+    snippet: str
+    fields: Dict[str, Any]
+
+
+class _Document:
+    __slots__ = ("title", "text", "version", "fields", "partition", "terms", "length")
+
+    def __init__(self, title: str, text: str, version: Any, fields: Dict[str, Any], partition: Any):
+        self.title = title
+        self.text = text
+        self.version = version
+        self.fields = fields
+        self.partition = partition
+        self.terms: Dict[str, int] = {}
+        for term in analyze(text):
+            self.terms[term] = self.terms.get(term, 0) + 1
+        for term in analyze(title):
+            self.terms[term] = self.terms.get(term, 0) + TITLE_WEIGHT
+        self.length = sum(self.terms.values())
+
+
+class BM25Index:
+    """
+    Inverted index ranking documents with Okapi BM25, updated per document.
+
+    With a partition field, documents are grouped by that field's value and
+    each group keeps its own collection statistics (document count, average
+    length, document frequencies), so short glossary entries and long lessons
+    are each scored against their own kind.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B, partition: Optional[str] = None):
+        self.k1 = k1
+        self.b = b
+        self.partition = partition
+        self._docs: Dict[Hashable, _Document] = {}
+        # term -> {doc id: term frequency}
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        # partition -> [document count, total length]
+        self._partitions: Dict[Any, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    def version(self, doc_id: Hashable) -> Any:
+        """The version a document was indexed at, or None if it is not indexed."""
+        doc = self._docs.get(doc_id)
+        return doc.version if doc is not None else None
+
+    def doc_ids(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._docs)
+
+    def add(self, doc_id: Hashable, title: str, text: str, version: Any = None, **fields: Any) -> None:
+        """Index a plain-text document, replacing any earlier version of it."""
+        partition = fields.get(self.partition) if self.partition else None
+        doc = _Document(title, text, version, fields, partition)
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = doc
+            stats = self._partitions.setdefault(partition, [0, 0])
+            stats[0] += 1
+            stats[1] += doc.length
+            for term, frequency in doc.terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Drop a document from the index if present."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: Hashable) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        stats = self._partitions[doc.partition]
+        stats[0] -= 1
+        stats[1] -= doc.length
+        if not stats[0]:
+            del self._partitions[doc.partition]
+        for term in doc.terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def _scores(self, terms: Set[str], where: Optional[Dict[str, Any]]) -> Dict[Hashable, float]:
+        """BM25 score of every document matching a term; call with the lock held."""
+        scores: Dict[Hashable, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            frequencies: Dict[Any, int] = {}
+            for doc_id in postings:
+                partition = self._docs[doc_id].partition
+                frequencies[partition] = frequencies.get(partition, 0) + 1
+            for doc_id, frequency in postings.items():
+                doc = self._docs[doc_id]
+                count, total_length = self._partitions[doc.partition]
+                matching = frequencies[doc.partition]
+                idf = math.log(1 + (count - matching + 0.5) / (matching + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * doc.length * count / total_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        if where:
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if self._matches(self._docs[doc_id], where)
+            }
+        return scores
+
+    def _page(
+        self,
+        ranked: List[Hashable],
+        scores: Dict[Hashable, float],
+        terms: Set[str],
+        skip: int,
+        limit: Optional[int],
+    ) -> List[SearchHit]:
+        """Build hits, with snippets, for one page of ranked documents."""
+        end = skip + limit if limit is not None else None
+        with self._lock:
+            page = [(doc_id, self._docs.get(doc_id)) for doc_id in ranked[skip:end]]
+        return [
+            SearchHit(doc_id, round(scores[doc_id], 6), doc.title, highlight(doc.text, terms), doc.fields)
+            for doc_id, doc in page
+            if doc is not None
+        ]
+
+    def search(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[int, List[SearchHit]]:
+        """
+        Rank documents matching any query term.
+
+        where restricts results to documents whose fields equal the given
+        values. Returns the total number of matches and the requested page,
+        with highlighted snippets built only for that page.
+        """
+        terms = set(analyze(query))
+        if not terms:
+            return 0, []
+        with self._lock:
+            scores = self._scores(terms, where)
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], str(doc_id)))
+        return len(scores), self._page(ranked, scores, terms, skip, limit)
+
+    def search_fused(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+        partitions: Optional[Sequence[Any]] = None,
+    ) -> Tuple[int, List[SearchHit], Dict[Any, int]]:
+        """
+        Rank matches within each partition, then merge the rankings.
+
+        BM25 scores of different partitions are not comparable, so the merged
+        order uses reciprocal rank fusion: a hit scores 1 / (RRF_K + its rank
+        within its partition), ties going to the higher BM25 score. Returns
+        the total, the requested page and the number of matches per partition
+        before the partitions filter is applied.
+        """
+        terms = set(analyze(query))
+        if not terms:
+            return 0, [], {}
+        with self._lock:
+            scores = self._scores(terms, where)
+            groups: Dict[Any, List[Hashable]] = {}
+            for doc_id in scores:
+                groups.setdefault(self._docs[doc_id].partition, []).append(doc_id)
+        facets = {partition: len(doc_ids) for partition, doc_ids in groups.items()}
+
+        fused: Dict[Hashable, float] = {}
+        for partition, doc_ids in groups.items():
+            if partitions is not None and partition not in partitions:
+                continue
+            doc_ids.sort(key=lambda doc_id: (-scores[doc_id], str(doc_id)))
+            for rank, doc_id in enumerate(doc_ids, 1):
+                fused[doc_id] = 1 / (RRF_K + rank)
+        ranked = sorted(fused, key=lambda doc_id: (-fused[doc_id], -scores[doc_id], str(doc_id)))
+        return len(fused), self._page(ranked, fused, terms, skip, limit), facets
+
+    def _matches(self, doc: _Document, where: Optional[Dict[str, Any]]) -> bool:
+        return not where or all(doc.fields.get(name) == value for name, value in where.items())
+
+    def sync(
+        self,
+        documents: Iterable[Tuple[Hashable, Any]],
+        load: Callable[[Hashable], Optional[Tuple[str, str, Dict[str, Any]]]],
+        where: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Bring the index in line with (doc id, version) pairs.
+
+        Only documents whose version changed are re-read with load(doc_id),
+        which returns (title, text, fields) or None to drop the document.
+        Indexed documents matching where that are missing from documents are
+        removed. Returns the number of documents re-indexed.
+        """
+        seen = set()
+        reindexed = 0
+        for doc_id, version in documents:
+            seen.add(doc_id)
+            if doc_id in self and self.version(doc_id) == version:
+                continue
+            loaded = load(doc_id)
+            if loaded is None:
+                self.remove(doc_id)
+                continue
+            title, text, fields = loaded
+            self.add(doc_id, title, text, version, **fields)
+            reindexed += 1
+        with self._lock:
+            stale = [
+                doc_id for doc_id, doc in self._docs.items()
+                if doc_id not in seen and self._matches(doc, where)
+            ]
+            for doc_id in stale:
+                self._remove(doc_id)
+        return reindexed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "partitions": {str(partition): stats[0] for partition, stats in self._partitions.items()},
+            }
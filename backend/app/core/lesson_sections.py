@@ -0,0 +1,135 @@
+"""
+Section index for progressive lesson loading.
+
+A lesson is split at its markdown headings into sections identified by byte
+offsets into the lesson file. Sections are read on demand through a memory
+map, so serving one section never loads the rest of the lesson.
+"""
+import hashlib
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+try:
+    from markdown.extensions.toc import slugify, unique
+except ImportError:
+    slugify = unique = None
+
+from app.core.frontmatter_header import decode_text
+
+HEADING_RE = re.compile(rb"^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*\r?$")
+FENCE_RE = re.compile(rb"^ {0,3}(`{3,}|~{3,})")
+
+
+class Section(NamedTuple):
+    """A heading and the text up to the next heading, as byte offsets."""
+    index: int
+    # Heading level; 0 for text before the first heading
+    level: int
+    title: str
+    id: str
+    start: int
+    end: int
+
+
+def _slug(title: str, used: Set[str]) -> str:
+    """Heading id matching the rendered lesson's table of contents for plain-text headings."""
+    if slugify is None:
+        return re.sub(r"[^\w]+", "-", title.lower()).strip("-")
+    return unique(slugify(title, "-"), used)
+
+
+def index_sections(data: Any, start: int = 0) -> List[Section]:
+    """Split markdown bytes (bytes or an mmap) at ATX headings outside code fences."""
+    headings = []
+    fence = None
+    pos = start
+    size = len(data)
+    while pos < size:
+        newline = data.find(b"\n", pos)
+        line_end = size if newline == -1 else newline + 1
+        line = data[pos:line_end].rstrip(b"\n")
+        match = FENCE_RE.match(line)
+        if match:
+            marker = match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[:1] == fence[:1] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None:
+            match = HEADING_RE.match(line)
+            if match:
+                title = match.group(2).decode("utf-8", "replace").strip()
+                headings.append((pos, len(match.group(1)), title))
+        pos = line_end
+
+    sections = []
+    used: Set[str] = set()
+    first = headings[0][0] if headings else size
+    if data[start:first].strip():
+        sections.append(Section(0, 0, "", "", start, first))
+    for i, (offset, level, title) in enumerate(headings):
+        end = headings[i + 1][0] if i + 1 < len(headings) else size
+        sections.append(Section(len(sections), level, title, _slug(title, used), offset, end))
+    return sections
+
+
+class SectionIndex:
+    """Sections of one version of a lesson."""
+
+    def __init__(
+        self,
+        sections: List[Section],
+        content_hash: str,
+        signature: Optional[Any] = None,
+        data: Optional[bytes] = None,
+    ):
+        self.sections = sections
+        self.content_hash = content_hash
+        # Stat signature of the indexed file, or the lesson bytes when not file-backed
+        self.signature = signature
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def subsections_end(self, index: int) -> int:
+        """Index just past a section's nested subsections."""
+        level = self.sections[index].level
+        end = index + 1
+        while end < len(self.sections) and self.sections[end].level > level and level > 0:
+            end += 1
+        return end
+
+    def toc(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "index": section.index,
+                "level": section.level,
+                "title": section.title,
+                "id": section.id,
+                "bytes": section.end - section.start,
+                "subsections_end": self.subsections_end(section.index),
+            }
+            for section in self.sections
+        ]
+
+    @property
+    def size(self) -> int:
+        return 64 * len(self.sections) + (len(self.data) if self.data is not None else 0)
+
+
+def index_file(path: Path, body_offset: int, signature: Any) -> SectionIndex:
+    """Index a lesson file's body through a memory map."""
+    with open(path, "rb") as f:
+        if not path.stat().st_size:
+            return SectionIndex([], hashlib.sha256(b"").hexdigest(), signature)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return SectionIndex(index_sections(mm, body_offset), hashlib.sha256(mm).hexdigest(), signature)
+
+
+def read_file_range(path: Path, start: int, end: int) -> str:
+    """Read part of a lesson file through a memory map."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return decode_text(mm[start:end])
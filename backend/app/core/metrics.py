@@ -0,0 +1,37 @@
+"""
+Lightweight in-process timing metrics.
+"""
+import threading
+from typing import Any, Dict
+
+
+class OperationMetrics:
+    """Thread-safe per-operation call counts and latencies."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, operation: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                stats = self._stats[operation] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            if ms > stats["max_ms"]:
+                stats["max_ms"] = ms
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the current metrics with average latency."""
+        with self._lock:
+            return {
+                operation: {
+                    "count": int(stats["count"]),
+                    "total_ms": round(stats["total_ms"], 3),
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+                for operation, stats in self._stats.items()
+            }
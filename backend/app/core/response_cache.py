@@ -0,0 +1,60 @@
+"""
+Pre-serialized, pre-compressed JSON payloads for static content responses.
+"""
+import gzip
+import json
+from typing import Any, Dict, List
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+class EncodedPayload:
+    """A JSON body serialized once, with every supported content-coding."""
+
+    __slots__ = ("bodies",)
+
+    def __init__(self, data: Any):
+        body = json.dumps(
+            data,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body)
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.bodies.values())
+
+
+def choose_encoding(accept_encoding: str, available: List[str]) -> str:
+    """Pick the best available content-coding allowed by an Accept-Encoding header."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
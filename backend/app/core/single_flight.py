@@ -0,0 +1,79 @@
+"""
+Request coalescing: concurrent calls for the same key share one execution.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent loads of the same key into a single call.
+
+    ``do`` serves threads; ``do_async`` serves coroutines on an event loop.
+    The first caller for a key runs the load and every caller that arrives
+    while it is in flight receives the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        task = self._async_calls.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # The load runs in its own task so no caller, the first one
+            # included, can cancel it for the others
+            task = asyncio.ensure_future(func())
+            self._async_calls[flight_key] = task
+
+            def done(finished: "asyncio.Future[Any]") -> None:
+                if self._async_calls.get(flight_key) is finished:
+                    del self._async_calls[flight_key]
+                # Mark retrieved so a load nobody awaited any more does not log noise
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
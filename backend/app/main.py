@@ -1,13 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Union
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.content_loader import content_loader
+from app.core.invalidation_bus import invalidation_bus
 from app.api.v1.api import api_router
 
+
+# Content warm-up progress, reported by the health checks
+content_warm_up: Dict[str, Any] = {"ready": False, "error": None, "loaded": None}
+
+
+async def warm_up_content() -> None:
+    """Open the content bundle, load and index all content, then mark this worker ready."""
+    try:
+        await content_loader.run("open_bundle", content_loader.open_bundle)
+    except Exception as e:
+        # Without its required bundle the worker must stay out of rotation
+        print(f"Content bundle unavailable: {e}")
+        content_warm_up["error"] = str(e)
+        return
+    if settings.CONTENT_WARM_UP:
+        try:
+            content_warm_up["loaded"] = await content_loader.run("warm_up", content_loader.warm_up)
+        except Exception as e:
+            # Content still loads on demand; a broken file must not keep the worker out of rotation
+            print(f"Content warm-up failed: {e}")
+            content_warm_up["error"] = str(e)
+    content_warm_up["ready"] = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Warm up in the background so the worker answers liveness checks meanwhile
+    warm_up = asyncio.create_task(warm_up_content())
+    # Reload content whenever another worker clears or reloads it
+    if invalidation_bus is not None:
+        invalidation_bus.start(lambda message: content_loader.refresh())
+    yield
+    if invalidation_bus is not None:
+        invalidation_bus.stop()
+    if not warm_up.done():
+        warm_up.cancel()
+
+
 app = FastAPI(
     title="Grammar Anatomy API",
     description="Backend API for the Grammar Anatomy learning application",
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -24,10 +69,28 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
-async def root():
+async def root() -> Dict[str, str]:
     return {"message": "Grammar Anatomy API is running!"}
 
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+async def health_check() -> Dict[str, Any]:
+    """Liveness plus readiness details; answers as long as the worker is up."""
+    return {"status": "healthy", "live": True, "ready": content_warm_up["ready"], "content": content_warm_up}
+
+
+@app.get("/health/live")
+async def liveness_check() -> Dict[str, str]:
+    return {"status": "alive"}
+
+
+# The 503 is returned directly, so the annotation is not a response model
+@app.get("/health/ready", response_model=None)
+async def readiness_check() -> Union[Dict[str, Any], JSONResponse]:
+    """Returns 503 until content is warmed up, so load balancers skip cold workers."""
+    if not content_warm_up["ready"]:
+        if content_warm_up["error"] is not None:
+            # The content bundle could not be opened; this worker never becomes ready
+            return JSONResponse(status_code=503, content={"status": "unavailable", "error": content_warm_up["error"]})
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready", "content": content_warm_up} 
\ No newline at end of file
@@ -15,6 +15,7 @@ class Lesson(Base):
     content = Column(Text, nullable=False)
     order = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     module = relationship("Module", back_populates="lessons")
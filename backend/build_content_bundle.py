@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Content Bundle Build Script for Grammar Anatomy App
+
+This script compiles the content directory (lessons, exercises and glossary)
+into a single versioned bundle that the API memory-maps at startup. Point
+CONTENT_BUNDLE_PATH at the output file to serve content from the bundle, or
+pass --snapshot-dir to publish the next shared snapshot for CONTENT_SNAPSHOT_DIR.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.content_bundle import build_bundle
+from app.core.content_snapshot import ContentSnapshot
+
+
+def main():
+    """Build the content bundle and report validation errors."""
+    parser = argparse.ArgumentParser(description="Compile content/ into a content bundle")
+    parser.add_argument("--content-dir", default="../content", help="Content directory to compile")
+    parser.add_argument("--output", default="content.bundle", help="Bundle file to write")
+    parser.add_argument(
+        "--snapshot-dir",
+        help="Publish to this shared snapshot directory instead of writing --output"
+    )
+    parser.add_argument(
+        "--allow-errors",
+        action="store_true",
+        help="Do not fail the build when content validation reports errors"
+    )
+    args = parser.parse_args()
+
+    if args.snapshot_dir:
+        publish_snapshot(args)
+        return
+
+    manifest = build_bundle(args.content_dir, args.output, allow_errors=args.allow_errors)
+    errors = [error for error_list in manifest["errors"].values() for error in error_list]
+
+    for error in errors:
+        print(f"  ❌ {error}")
+
+    if errors and not args.allow_errors:
+        # The existing bundle is left in place
+        print(f"Content validation failed, {args.output} not written")
+        sys.exit(1)
+
+    print(f"Bundle {manifest['version']} written to {args.output}")
+    print(f"  Modules: {len(manifest['modules'])}")
+
+
+def publish_snapshot(args):
+    """Build and validate the content once, then publish it as the next shared snapshot."""
+    snapshot = ContentSnapshot(args.snapshot_dir)
+    path, manifest = snapshot.build(args.content_dir, allow_errors=args.allow_errors)
+    errors = [error for error_list in manifest["errors"].values() for error in error_list]
+
+    for error in errors:
+        print(f"  ❌ {error}")
+
+    # Never hand broken content to every worker at once
+    if path is None:
+        print("Content validation failed, snapshot not published")
+        sys.exit(1)
+
+    info = snapshot.install(path)
+    print(f"Snapshot {info.counter} (bundle {manifest['version']}) is current in {args.snapshot_dir}")
+    print(f"  Modules: {len(manifest['modules'])}")
+
+
+if __name__ == "__main__":
+    main()
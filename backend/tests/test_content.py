@@ -2,10 +2,26 @@
 Tests for content management functionality.
 """
 import pytest
+import hashlib
 import json
+import pickle
+import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from app.core.content_loader import ContentLoader, Exercise, LessonContent, GlossaryEntry
+from app.core.content_bundle import BundleError, ContentBundle, build_bundle
+from app.core.content_records import ExerciseRecord, GlossaryRecord, LessonRecord
+from app.core.content_snapshot import ContentSnapshot, InvalidContentError
+from app.core.frontmatter_header import read_header
+from app.core.glossary_index import SymSpell, edit_distance
+from app.core.glossary_linker import AhoCorasick, GlossaryLinker
+from app.core.invalidation_bus import FileBus, create_bus
+from app.core.lesson_render import render_lesson
+from app.core.lesson_search import BM25Index, highlight, markdown_to_text, stem
+from app.core.lesson_sections import index_sections
+from app.core.lru_cache import LRUCache
+from app.core.response_cache import EncodedPayload, choose_encoding
+from app.core.single_flight import SingleFlight
 
 
 class TestContentLoader:
@@ -43,6 +59,52 @@ class TestContentLoader:
         results = self.loader.search_glossary("action")
         assert len(results) == 6
     
+    def test_search_glossary_ranking(self):
+        """Test that term matches rank above definition and example matches."""
+        results = self.loader.search_glossary("noun")
+        assert results[0].term == "Noun"
+        
+        # "Verb" matches both words in its term and definition
+        assert self.loader.search_glossary("subject verb")[0].term == "Verb"
+        
+        # Prefix and multi-word queries
+        assert self.loader.search_glossary("pronou")[0].term == "Pronoun"
+        assert [entry.term for entry in self.loader.search_glossary("new york")] == ["Noun"]
+        assert self.loader.search_glossary("zzzz") == []
+        assert self.loader.search_glossary("  ") == []
+    
+    def test_search_glossary_pagination(self):
+        """Test skip/limit over ranked glossary results."""
+        results = self.loader.search_glossary("action")
+        assert self.loader.search_glossary("action", limit=2) == results[:2]
+        assert self.loader.search_glossary("action", skip=2, limit=2) == results[2:4]
+        assert self.loader.search_glossary("action", skip=10) == []
+    
+    def test_suggest_glossary_terms(self):
+        """Test type-ahead suggestions over glossary terms."""
+        assert self.loader.suggest_glossary_terms("pro") == ["Pronoun"]
+        assert self.loader.suggest_glossary_terms("PRO") == ["Pronoun"]
+        
+        # Whole-term matches come before inner-word matches
+        suggestions = self.loader.suggest_glossary_terms("s")
+        assert suggestions.index("Subject") < suggestions.index("Run-on Sentence")
+        
+        assert len(self.loader.suggest_glossary_terms("p", limit=2)) == 2
+        assert self.loader.suggest_glossary_terms("zzz") == []
+    
+    def test_fuzzy_search_glossary(self):
+        """Test typo-corrected glossary search."""
+        corrected, results = self.loader.fuzzy_search_glossary("pronon")
+        assert corrected == "pronoun"
+        assert results[0].term == "Pronoun"
+        assert self.loader.fuzzy_search_glossary("run on sentance")[1][0].term == "Run-on Sentence"
+        assert self.loader.fuzzy_search_glossary("ADJECTVE", limit=1) == ("adjective", [self.loader.get_glossary_entry("Adjective")])
+        
+        # Correctly spelled words are kept; unknown words give up
+        assert self.loader.fuzzy_search_glossary("noun")[0] == "noun"
+        assert self.loader.fuzzy_search_glossary("xyzzy") == (None, [])
+        assert self.loader.fuzzy_search_glossary("") == (None, [])
+    
     def test_get_glossary(self):
         """Test getting glossary entries."""
         glossary = self.loader.get_glossary()
@@ -60,6 +122,21 @@ class TestContentLoader:
         # Test with non-existent category
         results = self.loader.get_glossary_by_category("Nonexistent")
         assert len(results) == 0
+        
+        assert self.loader.get_glossary_by_category("parts of speech") == \
+            self.loader.get_glossary_by_category("Parts of Speech")
+    
+    def test_get_glossary_entry(self):
+        """Test case-insensitive glossary term lookup."""
+        assert self.loader.get_glossary_entry("noun").term == "Noun"
+        assert self.loader.get_glossary_entry("NOUN").term == "Noun"
+        assert self.loader.get_glossary_entry("nonexistent") is None
+    
+    def test_get_glossary_categories(self):
+        """Test precomputed glossary categories."""
+        categories = self.loader.get_glossary_categories()
+        assert categories == sorted(set(entry.category for entry in self.loader.get_glossary()))
+        assert "Parts of Speech" in categories
     
     def test_validate_content(self):
         """Test content validation."""
@@ -94,6 +171,51 @@ class TestContentLoader:
         modules3 = self.loader.get_modules()
         assert modules3 == modules1
     
+    def test_lesson_and_exercise_cache(self):
+        """Test that lessons and exercises are served from the LRU cache."""
+        loader = ContentLoader("../content")
+        lesson1 = loader.get_lesson_content("01-nouns-verbs")
+        lesson2 = loader.get_lesson_content("01-nouns-verbs")
+        assert lesson1 is lesson2
+        
+        exercises1 = loader.get_exercises("01-nouns-verbs")
+        exercises2 = loader.get_exercises("01-nouns-verbs")
+        assert exercises1 is exercises2
+        
+        stats = loader.get_cache_stats()
+        assert stats["lessons"]["hits"] == 1
+        assert stats["lessons"]["misses"] == 1
+        assert stats["exercises"]["hits"] == 1
+        
+        # Missing modules are not cached
+        loader.get_lesson_content("nonexistent")
+        assert loader.get_cache_stats()["lessons"]["entries"] == 1
+        
+        loader.clear_cache()
+        assert loader.get_cache_stats()["lessons"]["entries"] == 0
+        assert loader.get_lesson_content("01-nouns-verbs") is not lesson1
+    
+    def test_get_exercise_index(self):
+        """Test global exercise lookups by module, content id and unique id."""
+        loader = ContentLoader("../content")
+        record = loader.get_exercise("ex1", "01-nouns-verbs")
+        assert record.module_id == "01-nouns-verbs"
+        assert record.exercise.id == "ex1"
+        assert loader.get_exercise("missing", "01-nouns-verbs") is None
+        
+        # Content ids identify an exercise without its module
+        found = loader.get_exercise(record.content_id)
+        assert found.exercise is record.exercise
+        
+        # "ex1" exists in several modules, so it is ambiguous on its own
+        assert loader.get_exercise("ex1") is None
+        
+        # The index is rebuilt for a new content version
+        index = loader._get_exercise_index()
+        assert loader._get_exercise_index() is index
+        loader.clear_cache()
+        assert loader._get_exercise_index() is not index
+    
     def test_exercise_validation(self):
         """Test exercise model validation."""
         # Valid exercise
@@ -147,6 +269,1389 @@ class TestContentLoader:
         assert entry.category == "Test Category"
 
 
+def write_module(root, module_id, title, order, body="# Body", exercises=None):
+    """Write a minimal module directory for loader tests."""
+    module_dir = root / "modules" / module_id
+    module_dir.mkdir(parents=True, exist_ok=True)
+    (module_dir / "lesson.md").write_text(
+        f'---\ntitle: "{title}"\norder: {order}\nmodule: "{module_id}"\n---\n\n{body}\n',
+        encoding="utf-8"
+    )
+    if exercises is not None:
+        (module_dir / "exercises.json").write_text(json.dumps(exercises), encoding="utf-8")
+    return module_dir
+
+
+SAMPLE_EXERCISE = {
+    "id": "ex1",
+    "type": "identification",
+    "prompt": "Identify the verb: Birds fly.",
+    "answer": "fly",
+    "explanation": "'fly' is the action."
+}
+
+
+class TestContentRecords:
+    """Test the compact records the loader keeps instead of Pydantic models."""
+    
+    def test_records_serialize_like_models(self):
+        data = dict(SAMPLE_EXERCISE, options=["fly", "Birds"])
+        record = ExerciseRecord.from_model(Exercise(**data))
+        assert record.model_dump() == Exercise(**data).model_dump()
+        assert record.dict()["options"] == ["fly", "Birds"]
+        assert record == Exercise(**data)
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.answer = "Birds"
+    
+    def test_repeated_strings_are_shared(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        write_module(tmp_path, "02-b", "Module B", 2, exercises=[dict(SAMPLE_EXERCISE, id="ex2")])
+        loader = ContentLoader(str(tmp_path))
+        first, second = loader.get_exercises("01-a")[0], loader.get_exercises("02-b")[0]
+        assert first.type is second.type
+        assert first.difficulty is second.difficulty
+        
+        entries = [
+            GlossaryRecord(term, "A word.", ["cat"], [], "".join(["Parts ", "of Speech"]))
+            for term in ("Noun", "Verb")
+        ]
+        assert entries[0].category is entries[1].category
+        assert entries[0].examples[0] is entries[1].examples[0]
+    
+    def test_lessons_pickle_without_their_reader(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Body")
+        lesson = ContentLoader(str(tmp_path)).get_lesson_content("01-a")
+        copied = pickle.loads(pickle.dumps(lesson))
+        assert copied == lesson
+        assert copied.body_loaded and not copied.deferred_body
+
+
+class TestContentRefresh:
+    """Test incremental reloading of changed content files."""
+    
+    def test_refresh_reloads_only_changed_files(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        write_module(tmp_path, "02-b", "Module B", 2, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path))
+        
+        assert [m["id"] for m in loader.get_modules()] == ["01-a", "02-b"]
+        lesson_a = loader.get_lesson_content("01-a")
+        lesson_b = loader.get_lesson_content("02-b")
+        exercises_b = loader.get_exercises("02-b")
+        
+        assert loader.refresh()["version"] == loader.version
+        assert loader.get_lesson_content("01-a") is lesson_a
+        
+        write_module(tmp_path, "01-a", "Module A (edited)", 3, body="# New body with more text")
+        changes = loader.refresh()
+        
+        assert changes["modules"] == ["01-a"]
+        assert changes["lessons"] == ["01-a"]
+        assert changes["exercises"] == []
+        assert [m["id"] for m in loader.get_modules()] == ["02-b", "01-a"]
+        assert loader.get_lesson_content("01-a").title == "Module A (edited)"
+        assert loader.get_lesson_content("02-b") is lesson_b
+        assert loader.get_exercises("02-b") is exercises_b
+    
+    def test_refresh_detects_added_and_removed_modules(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path))
+        loader.get_modules()
+        version = loader.version
+        
+        write_module(tmp_path, "02-b", "Module B", 2)
+        (tmp_path / "modules" / "01-a" / "lesson.md").unlink()
+        changes = loader.refresh()
+        
+        assert sorted(changes["modules"]) == ["01-a", "02-b"]
+        assert [m["id"] for m in loader.get_modules()] == ["02-b"]
+        assert loader.version == version + 1
+    
+    def test_refresh_reloads_glossary(self, tmp_path):
+        entry = {
+            "term": "Noun",
+            "definition": "A naming word.",
+            "examples": ["cat"],
+            "related_lessons": [],
+            "category": "Parts of Speech"
+        }
+        glossary_file = tmp_path / "glossary.json"
+        glossary_file.write_text(json.dumps([entry]), encoding="utf-8")
+        loader = ContentLoader(str(tmp_path))
+        assert len(loader.get_glossary()) == 1
+        
+        glossary_file.write_text(json.dumps([entry, dict(entry, term="Verb")]), encoding="utf-8")
+        assert loader.refresh()["glossary"] is True
+        assert len(loader.get_glossary()) == 2
+    
+    def test_auto_reload_interval(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path), reload_interval=0.0)
+        assert loader.get_lesson_content("01-a").title == "Module A"
+        
+        write_module(tmp_path, "01-a", "Module A (edited)", 1)
+        assert loader.get_lesson_content("01-a").title == "Module A (edited)"
+    
+    def test_warm_up_loads_everything(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1, body="# Nouns", exercises=[SAMPLE_EXERCISE])
+        write_module(content_dir, "02-b", "Module B", 2)
+        loader = ContentLoader(str(content_dir))
+        
+        loaded = loader.warm_up()
+        assert loaded["modules"] == 2 and loaded["exercises"] == 1
+        assert loader._exercise_index is not None
+        assert all(loader._lesson_cache.get(module_id).body_loaded for module_id in ("01-a", "02-b"))
+        assert loader.search_index.stats()["documents"] == 3
+
+
+class TestLazyLessons:
+    """Test header-only parsing and lazily loaded lesson bodies."""
+    
+    def test_read_header_stops_at_delimiter(self, tmp_path):
+        lesson_file = write_module(tmp_path, "01-a", "Module A", 3, body="# Body\n\nText") / "lesson.md"
+        header = read_header(lesson_file)
+        
+        assert header.metadata == {"title": "Module A", "order": 3, "module": "01-a"}
+        assert lesson_file.read_bytes()[header.body_offset:].strip() == b"# Body\n\nText"
+        
+        plain = tmp_path / "plain.md"
+        plain.write_text("# No frontmatter\n", encoding="utf-8")
+        assert read_header(plain).metadata == {}
+        assert read_header(plain).body_offset == 0
+    
+    def test_modules_listing_reads_headers_only(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path))
+        
+        with patch("app.core.content_loader.read_body") as read_body:
+            modules = loader.get_modules()
+            lesson = loader.get_lesson_content("01-a")
+        read_body.assert_not_called()
+        assert modules[0]["title"] == "Module A"
+        assert isinstance(lesson, LessonRecord) and lesson.deferred_body
+        assert not lesson.body_loaded
+        assert lesson.title == "Module A"
+    
+    def test_body_loads_on_first_access(self, tmp_path):
+        lesson_file = write_module(tmp_path, "01-a", "Module A", 1, body="# Body") / "lesson.md"
+        loader = ContentLoader(str(tmp_path))
+        lesson = loader.get_lesson_content("01-a")
+        
+        assert lesson.content == "# Body"
+        assert lesson.body_loaded
+        assert lesson.model_dump()["content"] == "# Body"
+        assert lesson == LessonContent(title="Module A", order=1, module="01-a", content="# Body")
+        assert loader.get_content_hash("lesson", "01-a") == \
+            hashlib.sha256(lesson_file.read_text(encoding="utf-8").encode("utf-8")).hexdigest()
+    
+    def test_body_edited_after_header_read(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Old")
+        loader = ContentLoader(str(tmp_path))
+        lesson = loader.get_lesson_content("01-a")
+        
+        write_module(tmp_path, "01-a", "Module A", 1, body="# A much longer new body")
+        assert lesson.content == "# A much longer new body"
+        assert loader.refresh()["lessons"] == ["01-a"]
+
+
+class TestLessonRendering:
+    """Test server-side rendering of lesson markdown."""
+    
+    def test_render_sanitizes_html_and_urls(self):
+        rendered = render_lesson(
+            "Hi <script>alert(1)</script>\n\n<div onclick=\"x\">raw</div>\n\n"
+            "[bad](javascript:alert(1)) [ok](https://example.com)\n\n"
+            "[x](&#106;avascript:alert(1)) [y](java&#x09;script:alert(1)) ![z](&#x6A;avascript:alert(1))"
+        )
+        assert "<script>" not in rendered.html
+        assert "&lt;script&gt;" in rendered.html
+        assert "<div" not in rendered.html
+        # Including entity-encoded schemes such as &#106;avascript:
+        assert "avascript" not in rendered.html
+        assert '<a href="https://example.com">ok</a>' in rendered.html
+    
+    def test_render_builds_toc_and_ast(self):
+        rendered = render_lesson("# Nouns &amp; Verbs\n\nSome *text*.\n\n## Types\n\n### Proper\n\n## Usage\n")
+        
+        assert rendered.headings == [
+            {"level": 1, "id": "nouns-verbs", "title": "Nouns & Verbs"},
+            {"level": 2, "id": "types", "title": "Types"},
+            {"level": 3, "id": "proper", "title": "Proper"},
+            {"level": 2, "id": "usage", "title": "Usage"},
+        ]
+        assert [child["id"] for child in rendered.toc[0]["children"]] == ["types", "usage"]
+        assert rendered.toc[0]["children"][0]["children"][0]["title"] == "Proper"
+        assert rendered.ast[0] == {"type": "h1", "attrs": {"id": "nouns-verbs"}, "children": ["Nouns & Verbs"]}
+        assert rendered.ast[1] == {"type": "p", "children": ["Some ", {"type": "em", "children": ["text"]}, "."]}
+    
+    def test_rendered_once_per_version(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Old")
+        loader = ContentLoader(str(tmp_path))
+        rendered = loader.get_rendered_lesson("01-a")
+        
+        assert rendered.headings[0]["title"] == "Old"
+        assert loader.get_rendered_lesson("01-a") is rendered
+        assert loader.get_rendered_lesson("missing") is None
+        
+        write_module(tmp_path, "01-a", "Module A", 1, body="# New and longer")
+        loader.refresh()
+        assert loader.get_rendered_lesson("01-a").headings[0]["title"] == "New and longer"
+        assert loader.get_cache_stats()["renders"]["misses"] == 2
+
+
+class TestGlossaryLinking:
+    """Test glossary term auto-linking in lessons."""
+    
+    @staticmethod
+    def glossary_entry(term):
+        return {
+            "term": term,
+            "definition": f"Definition of {term}.",
+            "examples": [],
+            "related_lessons": [],
+            "category": "Parts of Speech"
+        }
+    
+    def test_automaton_finds_all_occurrences(self):
+        patterns = {"he": 1, "she": 2, "his": 3, "hers": 4}
+        automaton = AhoCorasick(patterns)
+        text = "ushers and his shed"
+        expected = sorted(
+            (i, i + len(p), v) for p, v in patterns.items()
+            for i in range(len(text)) if text.startswith(p, i)
+        )
+        assert sorted(automaton.iter_matches(text)) == expected
+    
+    def test_linker_prefers_longest_whole_word_match(self):
+        linker = GlossaryLinker(["Noun", "Proper Noun", "Pronoun"])
+        text = "Proper nouns, a pronoun and a noun, but not renouncing."
+        assert [(text[start:end], term) for start, end, term in linker.find(text)] == [
+            ("Proper nouns", "Proper Noun"),
+            ("pronoun", "Pronoun"),
+            ("noun", "Noun"),
+        ]
+    
+    def test_markdown_spans_skip_code_headings_and_links(self):
+        linker = GlossaryLinker(["Noun"])
+        text = "# Noun\n\nA noun, `noun`, [noun](x).\n\n```\nnoun\n```\n\nLast noun"
+        assert [start for start, _, _ in linker.find_in_markdown(text)] == [10, len(text) - 4]
+    
+    def test_linked_lesson_cached_per_glossary_version(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Nouns\n\nA noun and a verb.")
+        glossary_file = tmp_path / "glossary.json"
+        glossary_file.write_text(json.dumps([self.glossary_entry("Noun")]), encoding="utf-8")
+        loader = ContentLoader(str(tmp_path))
+        
+        linked = loader.get_linked_lesson("01-a")
+        assert loader.get_linked_lesson("01-a") is linked
+        assert linked.html.count('class="glossary-term"') == 1
+        assert 'href="/api/v1/content/glossary/Noun"' in linked.html
+        assert [span["term"] for span in linked.spans] == ["Noun"]
+        
+        glossary_file.write_text(
+            json.dumps([self.glossary_entry("Noun"), self.glossary_entry("Verb")]),
+            encoding="utf-8"
+        )
+        loader.refresh()
+        relinked = loader.get_linked_lesson("01-a")
+        assert [span["term"] for span in relinked.spans] == ["Noun", "Verb"]
+        assert relinked.ast[0] == linked.ast[0]
+
+
+class TestLessonSections:
+    """Test heading-level section indexes for progressive lesson loading."""
+    
+    BODY = "Intro text.\n\n# Title\n\nLead.\n\n## First\n\n```\n# not a heading\n```\n\n### Nested\n\nDeep.\n\n## Second\n\nEnd."
+    
+    def test_index_sections_skips_code_fences(self):
+        sections = index_sections(self.BODY.encode("utf-8"))
+        assert [(s.level, s.title, s.id) for s in sections] == [
+            (0, "", ""),
+            (1, "Title", "title"),
+            (2, "First", "first"),
+            (3, "Nested", "nested"),
+            (2, "Second", "second"),
+        ]
+    
+    def test_read_sections_by_offset(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body=self.BODY)
+        loader = ContentLoader(str(tmp_path))
+        index = loader.get_lesson_sections("01-a")
+        
+        assert loader.get_lesson_sections("01-a") is index
+        assert loader.read_lesson_sections("01-a", 0) == "Intro text."
+        assert loader.read_lesson_sections("01-a", 2) == "## First\n\n```\n# not a heading\n```"
+        assert loader.read_lesson_sections("01-a", 2, index.subsections_end(2)).endswith("Deep.")
+        assert index.subsections_end(1) == 5
+        with pytest.raises(IndexError):
+            loader.read_lesson_sections("01-a", 4, 9)
+        assert loader.get_lesson_sections("missing") is None
+        
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Only\n\nOne section now.")
+        # A span checked against the old index is read through it, not the new one
+        loader.read_lesson_sections("01-a", 4, 5, index)
+        assert loader.read_lesson_sections("01-a", 0) == "# Only\n\nOne section now."
+        assert len(loader.get_lesson_sections("01-a")) == 1
+    
+    def test_sections_from_bundle(self, tmp_path):
+        bundle_path = tmp_path / "content.bundle"
+        build_bundle("../content", bundle_path)
+        source = ContentLoader("../content")
+        loader = ContentLoader("../content", bundle_path=str(bundle_path))
+        
+        # Bundled bodies are stripped, so only byte counts may differ
+        assert [s.id for s in loader.get_lesson_sections("02-pronouns").sections] == \
+            [s.id for s in source.get_lesson_sections("02-pronouns").sections]
+        assert loader.read_lesson_sections("02-pronouns", 1, 3) == source.read_lesson_sections("02-pronouns", 1, 3)
+
+
+class TestSpellingIndex:
+    """Test the symmetric-delete spelling index behind fuzzy glossary search."""
+    
+    def test_edit_distance(self):
+        assert edit_distance("pronoun", "pronoun", 2) == 0
+        assert edit_distance("pronon", "pronoun", 2) == 1
+        assert edit_distance("cluase", "clause", 2) == 1  # adjacent swap
+        assert edit_distance("verb", "adverb", 2) == 2
+        assert edit_distance("noun", "adjective", 2) == 3
+    
+    def test_lookup_matches_brute_force(self):
+        words = ["noun", "nouns", "pronoun", "verb", "adverb", "clause", "cause", "tense", "sense"]
+        index = SymSpell(words)
+        for query in ["nuon", "pronun", "claus", "tens", "adverbs", "xyz", "verbb"]:
+            expected = sorted(
+                ((word, edit_distance(query, word, 2)) for word in words if edit_distance(query, word, 2) <= 2),
+                key=lambda match: (match[1], match[0])
+            )
+            assert index.lookup(query) == expected
+        assert index.lookup("claus", max_distance=1) == [("clause", 1)]
+
+
+class TestLessonSearch:
+    """Test BM25 full-text search over lesson bodies."""
+    
+    def test_stem_conflates_inflections(self):
+        assert stem("phrases") == stem("phrase")
+        assert stem("running") == stem("runs") == "run"
+        assert stem("studies") == stem("studied") == "study"
+        assert stem("class") == "class"
+        assert stem("analysis") == "analysis"
+    
+    def test_markdown_to_text(self):
+        text = markdown_to_text("# Nouns\n\n- A **noun** names a [person](http://x).\n\n```\nThe cat sat.\n```")
+        # Fence markers go, example text inside them stays searchable
+        assert text == "Nouns A noun names a person. The cat sat."
+    
+    def test_highlight_marks_matches_and_escapes(self):
+        snippet = highlight("Verbs <b> describe actions.", {stem("verb"), stem("action")})
+        assert snippet == "<mark>Verbs</mark> &lt;b&gt; describe <mark>actions</mark>."
+        
+        long_text = "filler " * 100 + "a pronoun replaces a noun " + "filler " * 100
+        snippet = highlight(long_text, {stem("pronoun")})
+        assert snippet.startswith("…") and snippet.endswith("…")
+        assert "<mark>pronoun</mark>" in snippet
+    
+    def test_bm25_ranking_and_incremental_updates(self):
+        index = BM25Index()
+        index.add("a", "Nouns", "A noun names a person, place or thing.", version=1)
+        index.add("b", "Verbs", "Verbs describe actions. A verb can follow a noun.", version=1)
+        index.add("c", "Adjectives", "Adjectives describe nouns.", version=1)
+        
+        total, hits = index.search("noun")
+        assert total == 3
+        assert hits[0].doc_id == "a"
+        assert index.search("verbs")[1][0].doc_id == "b"
+        
+        index.add("b", "Verbs", "Verbs describe actions.", version=2)
+        assert [hit.doc_id for hit in index.search("noun")[1]] == ["a", "c"]
+        index.remove("c")
+        assert index.search("adjective") == (0, [])
+        assert index.stats()["documents"] == 2
+    
+    def test_sync_reindexes_only_changed_documents(self):
+        index = BM25Index()
+        loads = []
+        
+        def load(doc_id):
+            loads.append(doc_id)
+            return doc_id.title(), f"text about {doc_id}", {"source": "test"}
+        
+        assert index.sync([("alpha", 1), ("beta", 1)], load, where={"source": "test"}) == 2
+        index.add("other", "Other", "alpha", source="elsewhere")
+        assert index.sync([("alpha", 1), ("gamma", 1)], load, where={"source": "test"}) == 1
+        assert loads == ["alpha", "beta", "gamma"]
+        assert sorted(index.doc_ids()) == ["alpha", "gamma", "other"]
+    
+    def test_search_lessons_follows_content_changes(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, body="# Nouns\n\nA noun names a thing.")
+        write_module(tmp_path, "02-b", "Module B", 2, body="# Verbs\n\nVerbs describe actions.")
+        loader = ContentLoader(str(tmp_path))
+        
+        total, hits = loader.search_lessons("nouns")
+        assert total == 1
+        assert hits[0].doc_id == ("lesson", "01-a")
+        assert hits[0].fields == {"source": "content", "type": "lesson", "module_id": "01-a"}
+        assert "<mark>noun</mark>" in hits[0].snippet
+        
+        write_module(tmp_path, "02-b", "Module B", 2, body="# Verbs\n\nVerbs describe what a noun does.")
+        with patch.object(loader.search_index, "add", wraps=loader.search_index.add) as add:
+            loader.refresh()
+            total, hits = loader.search_lessons("noun")
+        assert total == 2
+        # Only the edited lesson was re-indexed
+        assert [call.args[0] for call in add.call_args_list] == [("lesson", "02-b")]
+        assert loader.search_lessons("noun", source="db") == (0, [])
+    
+    def test_partitions_keep_their_own_statistics(self):
+        index = BM25Index(partition="type")
+        index.add("g", "Noun", "A naming word.", type="glossary")
+        index.add("l1", "Nouns", "A long lesson about nouns " + "and other words " * 50, type="lesson")
+        index.add("l2", "Verbs", "A long lesson about verbs " + "and other words " * 50, type="lesson")
+        
+        total, hits, facets = index.search_fused("noun")
+        assert facets == {"glossary": 1, "lesson": 1}
+        # Both rank first within their own kind, so their fused scores tie
+        assert sorted(hit.doc_id for hit in hits) == ["g", "l1"]
+        assert hits[0].score == hits[1].score
+        
+        total, hits, facets = index.search_fused("noun", partitions=["lesson"])
+        assert total == 1 and hits[0].doc_id == "l1"
+        assert facets == {"glossary": 1, "lesson": 1}
+        assert index.stats()["partitions"] == {"glossary": 1, "lesson": 2}
+    
+    def test_search_spans_lessons_exercises_and_glossary(self, tmp_path):
+        exercise = dict(SAMPLE_EXERCISE, prompt="Identify the pronoun: She runs.", explanation="'She' replaces a noun.")
+        write_module(tmp_path, "01-a", "Pronouns", 1, body="A pronoun replaces a noun.", exercises=[exercise])
+        glossary_file = tmp_path / "glossary.json"
+        entry = {
+            "term": "Pronoun",
+            "definition": "A word that takes the place of a noun.",
+            "examples": ["he", "she"],
+            "related_lessons": ["01-a"],
+            "category": "Parts of Speech"
+        }
+        glossary_file.write_text(json.dumps([entry]), encoding="utf-8")
+        loader = ContentLoader(str(tmp_path))
+        
+        total, hits, facets = loader.search("pronouns")
+        assert total == 3
+        assert facets == {"lesson": 1, "exercise": 1, "glossary": 1}
+        assert {hit.doc_id for hit in hits} == {("lesson", "01-a"), ("exercise", "01-a", "ex1"), ("glossary", "Pronoun")}
+        assert loader.search("pronoun", types=["glossary"])[1][0].fields["category"] == "Parts of Speech"
+        
+        glossary_file.write_text(json.dumps([dict(entry, term="Pronouns")]), encoding="utf-8")
+        loader.refresh()
+        assert [hit.doc_id for hit in loader.search("pronoun", types=["glossary"])[1]] == [("glossary", "Pronouns")]
+
+
+class TestStaleWhileRevalidate:
+    """Test serving the previous content while a reload builds in the background."""
+    
+    def test_refresh_swaps_in_rebuilt_state(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        write_module(tmp_path, "02-b", "Module B", 2, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path), stale_while_revalidate=True)
+        loader.get_modules()
+        old_lesson = loader.get_lesson_content("01-a")
+        lesson_b = loader.get_lesson_content("02-b")
+        exercises_b = loader.get_exercises("02-b")
+        old_state = loader._state
+        
+        write_module(tmp_path, "01-a", "Module A (edited)", 1)
+        changes = loader.refresh()
+        
+        assert changes["lessons"] == ["01-a"]
+        assert loader._state is not old_state
+        assert loader.version == changes["version"]
+        # The replacement state is fully warmed: no reads are left to the next request
+        assert "01-a" in loader._lesson_cache
+        assert loader.get_lesson_content("01-a").title == "Module A (edited)"
+        assert loader.get_lesson_content("02-b") is lesson_b
+        assert loader.get_exercises("02-b") is exercises_b
+        # The previous state was never mutated
+        assert old_state.lesson_cache.peek("01-a") is old_lesson
+    
+    def test_unchanged_refresh_keeps_state(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path), stale_while_revalidate=True)
+        loader.get_lesson_content("01-a")
+        state = loader._state
+        
+        loader.refresh()
+        assert loader._state is state
+    
+    def test_unchanged_refresh_builds_nothing(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path), stale_while_revalidate=True)
+        loader.get_modules()
+        loader.get_lesson_content("01-a")
+        loader.get_exercises("01-a")
+        
+        with patch.object(loader, "_builder", wraps=loader._builder) as builder:
+            assert loader.refresh()["version"] == loader.version
+            builder.assert_not_called()
+            
+            write_module(tmp_path, "02-b", "Module B", 2)
+            assert loader.refresh()["modules"] == ["02-b"]
+            builder.assert_called_once()
+    
+    def test_reads_do_not_wait_for_rebuild(self, tmp_path):
+        import threading
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path), reload_interval=0.05, stale_while_revalidate=True)
+        lesson = loader.get_lesson_content("01-a")
+        
+        release = threading.Event()
+        original = loader._load_lesson_content
+        
+        def slow_load(module_id):
+            release.wait(5)
+            return original(module_id)
+        
+        loader._load_lesson_content = slow_load
+        try:
+            loader.clear_cache()
+            time.sleep(0.1)
+            # A refresh is due, but the rebuild in flight must not block the read
+            start = time.monotonic()
+            assert loader.get_lesson_content("01-a") is lesson
+            loader.get_modules()
+            assert time.monotonic() - start < 0.5
+        finally:
+            release.set()
+        assert loader.wait_for_revalidation(5)
+    
+    def test_clear_cache_serves_stale_until_swap(self, tmp_path):
+        import threading
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path), stale_while_revalidate=True)
+        lesson = loader.get_lesson_content("01-a")
+        version = loader.version
+        
+        release = threading.Event()
+        original = loader._load_lesson_content
+        
+        def slow_load(module_id):
+            release.wait(5)
+            return original(module_id)
+        
+        loader._load_lesson_content = slow_load
+        write_module(tmp_path, "01-a", "Module A (edited)", 1)
+        loader.clear_cache()
+        
+        # Readers keep getting the old content while the rebuild is blocked
+        assert loader.get_lesson_content("01-a") is lesson
+        assert loader.version == version
+        
+        release.set()
+        assert loader.wait_for_revalidation(5)
+        assert loader.version == version + 1
+        assert loader.get_lesson_content("01-a").title == "Module A (edited)"
+    
+    def test_auto_reload_revalidates_in_background(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path), reload_interval=0.0, stale_while_revalidate=True)
+        assert loader.get_lesson_content("01-a").title == "Module A"
+        assert loader.wait_for_revalidation(5)
+        
+        write_module(tmp_path, "01-a", "Module A (edited)", 1)
+        loader.get_lesson_content("01-a")
+        assert loader.wait_for_revalidation(5)
+        loader.reload_interval = None
+        assert loader.get_lesson_content("01-a").title == "Module A (edited)"
+
+
+class TestContentValidation:
+    """Test the parallel, streaming validation engine."""
+    
+    @staticmethod
+    def write_catalog(root, count=16):
+        for i in range(count):
+            write_module(root, f"{i:02d}-m", f"Module {i}", i, exercises=[SAMPLE_EXERCISE])
+        write_module(root, "98-bad", "Bad", 98, exercises=[dict(SAMPLE_EXERCISE, type="essay")])
+        write_module(root, "99-empty", "Empty", 99, exercises=[])
+    
+    def test_parallel_matches_serial(self, tmp_path):
+        self.write_catalog(tmp_path)
+        serial = ContentLoader(str(tmp_path)).validation_report(workers=1)
+        parallel = ContentLoader(str(tmp_path)).validation_report(workers=2)
+        
+        assert parallel == serial
+        assert serial["valid"] is False
+        assert serial["summary"] == {
+            "modules": 18,
+            "glossary_entries": 0,
+            "total_exercises": 17,
+            "revalidated_modules": 18
+        }
+        assert serial["errors"]["exercises"] == [
+            "Module 98-bad, Exercise ex1: Invalid type 'essay'",
+            "Module 99-empty: No exercises found",
+        ]
+        assert serial["errors"]["glossary"] == ["No glossary entries found"]
+    
+    def test_workers_do_not_open_snapshot(self, tmp_path, monkeypatch):
+        self.write_catalog(tmp_path / "content")
+        snapshot = ContentSnapshot(tmp_path / "snapshot")
+        monkeypatch.setenv("CONTENT_SNAPSHOT_DIR", str(snapshot.directory))
+        
+        # Workers importing the loader must not wait on a publish in progress
+        with snapshot._locked():
+            report = ContentLoader(str(tmp_path / "content")).validation_report(workers=2)
+        assert report["summary"]["modules"] == 18
+        assert snapshot.current() is None
+    
+    def test_each_module_parsed_once(self, tmp_path):
+        self.write_catalog(tmp_path, count=2)
+        loader = ContentLoader(str(tmp_path))
+        calls = []
+        original = ContentLoader._load_exercises
+        
+        def load(self, module_id):
+            calls.append(module_id)
+            return original(self, module_id)
+        
+        with patch.object(ContentLoader, "_load_exercises", load):
+            results = list(loader.iter_validation(workers=1))
+        assert [r["module"] for r in results[:-1]] == ["00-m", "01-m", "98-bad", "99-empty"]
+        assert results[-1]["summary"]["total_exercises"] == 3
+        assert sorted(calls) == ["00-m", "01-m", "98-bad", "99-empty"]
+    
+    def test_stream_endpoint(self, client):
+        response = client.get("/api/v1/content/content/validate", params={"stream": True, "full": True})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        
+        summary = client.get("/api/v1/content/content/validate", params={"full": True}).json()
+        assert lines[-1] == summary
+        assert sorted(line["module"] for line in lines[:-1]) == \
+            sorted(m["id"] for m in client.get("/api/v1/content/modules").json())
+
+
+class TestIncrementalValidation:
+    """Test validation results persisted between runs."""
+    
+    def test_only_changed_modules_are_rechecked(self, tmp_path):
+        content = tmp_path / "content"
+        write_module(content, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        write_module(content, "02-b", "Module B", 2, exercises=[SAMPLE_EXERCISE])
+        cache_path = tmp_path / "validation.json"
+        
+        def run():
+            loader = ContentLoader(str(content), validation_cache_path=str(cache_path))
+            return loader.validation_report()
+        
+        first = run()
+        assert first["summary"]["revalidated_modules"] == 2
+        assert cache_path.exists()
+        
+        second = run()
+        assert second["summary"]["revalidated_modules"] == 0
+        assert second["errors"] == first["errors"]
+        
+        # Rewriting identical bytes changes the stat signature but not the hash
+        lesson_file = content / "modules" / "01-a" / "lesson.md"
+        lesson_file.write_bytes(lesson_file.read_bytes())
+        assert run()["summary"]["revalidated_modules"] == 0
+        
+        write_module(content, "02-b", "Module B", 2, exercises=[dict(SAMPLE_EXERCISE, type="essay")])
+        third = run()
+        assert third["summary"]["revalidated_modules"] == 1
+        assert third["errors"]["exercises"] == ["Module 02-b, Exercise ex1: Invalid type 'essay'"]
+        
+        uncached = ContentLoader(str(content), validation_cache_path=str(cache_path))
+        assert uncached.validation_report(use_cache=False)["summary"]["revalidated_modules"] == 2
+    
+    def test_edits_not_yet_reloaded_are_validated(self, tmp_path):
+        content = tmp_path / "content"
+        write_module(content, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        cache_path = tmp_path / "validation.json"
+        loader = ContentLoader(str(content), validation_cache_path=str(cache_path))
+        assert loader.get_exercises("01-a")[0].type == SAMPLE_EXERCISE["type"]
+        assert loader.validation_report()["errors"]["exercises"] == []
+        
+        # The loader still holds the old exercises in its cache
+        write_module(content, "01-a", "Module A", 1, exercises=[dict(SAMPLE_EXERCISE, type="BOGUS")])
+        expected = ["Module 01-a, Exercise ex1: Invalid type 'BOGUS'"]
+        assert loader.validation_report()["errors"]["exercises"] == expected
+        assert loader.get_exercises("01-a")[0].type == SAMPLE_EXERCISE["type"]
+        
+        fresh = ContentLoader(str(content), validation_cache_path=str(cache_path))
+        assert fresh.validation_report()["errors"]["exercises"] == expected
+    
+    def test_cross_reference_warnings(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        entry = {
+            "term": "Noun",
+            "definition": "A naming word.",
+            "examples": ["cat"],
+            "related_lessons": ["01-a", "09-missing"],
+            "category": "Parts of Speech"
+        }
+        (tmp_path / "glossary.json").write_text(json.dumps([entry]), encoding="utf-8")
+        cache_path = tmp_path / "validation.json"
+        
+        for _ in range(2):
+            report = ContentLoader(str(tmp_path), validation_cache_path=str(cache_path)).validation_report()
+            assert report["valid"] is True
+            assert report["warnings"]["glossary"] == [
+                "Glossary term 'Noun': Related lesson '09-missing' does not exist"
+            ]
+
+
+class TestContentHashes:
+    """Test content hashes maintained for conditional responses."""
+    
+    def test_hashes_track_file_changes(self, tmp_path):
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path))
+        
+        modules_hash = loader.get_content_hash("modules")
+        lesson_hash = loader.get_content_hash("lesson", "01-a")
+        exercises_hash = loader.get_content_hash("exercises", "01-a")
+        assert modules_hash and lesson_hash and exercises_hash
+        assert loader.get_content_hash("lesson", "missing") is None
+        assert loader.get_content_hash("glossary") is None
+        
+        write_module(tmp_path, "01-a", "Module A (edited)", 1)
+        loader.refresh()
+        assert loader.get_content_hash("lesson", "01-a") != lesson_hash
+        assert loader.get_content_hash("modules") != modules_hash
+        assert loader.get_content_hash("exercises", "01-a") == exercises_hash
+    
+    def test_bundle_hashes(self, tmp_path):
+        bundle_path = tmp_path / "content.bundle"
+        build_bundle("../content", bundle_path)
+        bundle_loader = ContentLoader("../content", bundle_path=str(bundle_path))
+        
+        assert bundle_loader.get_content_hash("lesson", "01-nouns-verbs") == \
+            ContentBundle(bundle_path).content_hash("01-nouns-verbs", "lesson")
+        assert bundle_loader.get_content_hash("glossary")
+        assert bundle_loader.get_content_hash("modules")
+
+
+class TestAsyncContentLoader:
+    """Test the async loading path that offloads blocking reads."""
+    
+    def test_async_getters_offload_misses(self, tmp_path):
+        import asyncio
+        import threading
+        write_module(tmp_path, "01-a", "Module A", 1, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path), loader_threads=2)
+        threads = []
+        original = loader._load_lesson_content
+        
+        def load(module_id):
+            threads.append(threading.current_thread().name)
+            return original(module_id)
+        
+        loader._load_lesson_content = load
+        
+        async def scenario():
+            modules = await loader.aget_modules()
+            lesson = await loader.aget_lesson_content("01-a")
+            cached = await loader.aget_lesson_content("01-a")
+            exercises = await loader.aget_exercises("01-a")
+            record = await loader.aget_exercise("ex1", "01-a")
+            return modules, lesson, cached, exercises, record
+        
+        modules, lesson, cached, exercises, record = asyncio.run(scenario())
+        assert [m["id"] for m in modules] == ["01-a"]
+        assert lesson is cached
+        assert len(exercises) == 1
+        assert record.exercise is exercises[0]
+        assert len(threads) == 1
+        assert threads[0].startswith("content-loader")
+        
+        metrics = loader.get_operation_metrics()
+        assert metrics["lesson"]["count"] == 1
+        assert metrics["modules"]["count"] == 1
+        assert "exercise_index" in metrics
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent cache misses."""
+    
+    @staticmethod
+    def slow_loader(tmp_path, calls):
+        import time
+        write_module(tmp_path, "01-a", "Module A", 1)
+        loader = ContentLoader(str(tmp_path))
+        original = loader._load_lesson_content
+        
+        def load(module_id):
+            calls.append(module_id)
+            time.sleep(0.05)
+            return original(module_id)
+        
+        loader._load_lesson_content = load
+        return loader
+    
+    def test_threads_share_one_load(self, tmp_path):
+        from concurrent.futures import ThreadPoolExecutor
+        calls = []
+        loader = self.slow_loader(tmp_path, calls)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            lessons = list(pool.map(lambda _: loader.get_lesson_content("01-a"), range(8)))
+        
+        assert calls == ["01-a"]
+        assert all(lesson is lessons[0] for lesson in lessons)
+        assert loader.get_cache_stats()["coalesced_loads"] > 0
+    
+    def test_coroutines_share_one_load(self, tmp_path):
+        import asyncio
+        calls = []
+        loader = self.slow_loader(tmp_path, calls)
+        
+        async def scenario():
+            return await asyncio.gather(*(loader.aget_lesson_content("01-a") for _ in range(8)))
+        
+        lessons = asyncio.run(scenario())
+        assert calls == ["01-a"]
+        assert all(lesson is lessons[0] for lesson in lessons)
+        assert loader.get_operation_metrics()["lesson"]["count"] == 1
+    
+    def test_errors_reach_every_waiter(self):
+        import threading
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+        
+        def fail():
+            started.set()
+            release.wait()
+            raise ValueError("boom")
+        
+        def call():
+            try:
+                flight.do("key", fail)
+            except ValueError as e:
+                errors.append(e)
+        
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        while flight.coalesced == 0:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+        
+        assert len(errors) == 2
+        assert errors[0] is errors[1]
+    
+    def test_cancelled_caller_does_not_cancel_others(self):
+        import asyncio
+        flight = SingleFlight()
+        calls = []
+        
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "lesson"
+        
+        async def scenario():
+            leader = asyncio.ensure_future(flight.do_async("key", load))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do_async("key", load))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, leader.cancelled()
+        
+        assert asyncio.run(scenario()) == ("lesson", True)
+        assert calls == [1]
+
+
+class TestContentBundle:
+    """Test compiling content into a bundle and serving from it."""
+    
+    def test_build_and_serve_bundle(self, tmp_path):
+        bundle_path = tmp_path / "content.bundle"
+        manifest = build_bundle("../content", bundle_path)
+        assert not any(manifest["errors"].values())
+        
+        bundle = ContentBundle(bundle_path)
+        assert bundle.version == manifest["version"]
+        
+        source = ContentLoader("../content")
+        loader = ContentLoader("../content", bundle_path=str(bundle_path))
+        assert loader._bundle is not None
+        assert [m["id"] for m in loader.get_modules()] == [m["id"] for m in source.get_modules()]
+        assert loader.get_modules()[0]["title"] == source.get_modules()[0]["title"]
+        assert loader.get_lesson_content("01-nouns-verbs") == source.get_lesson_content("01-nouns-verbs")
+        assert loader.get_exercises("02-pronouns") == source.get_exercises("02-pronouns")
+        assert loader.get_glossary() == source.get_glossary()
+        assert loader.get_lesson_content("nonexistent") is None
+    
+    def test_missing_bundle_falls_back_only_when_allowed(self, tmp_path):
+        missing = str(tmp_path / "missing.bundle")
+        loader = ContentLoader("../content", bundle_path=missing)
+        assert loader._bundle is None
+        assert len(loader.get_modules()) > 0
+        
+        # Importing the loader (build tooling does) must not need the bundle
+        required = ContentLoader("../content", bundle_path=missing, require_bundle=True)
+        with pytest.raises(BundleError):
+            required.open_bundle()
+        with pytest.raises(BundleError):
+            required.get_modules()
+    
+    def test_first_build_with_required_bundle(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1)
+        bundle_path = tmp_path / "content.bundle"
+        loader = ContentLoader(str(content_dir), bundle_path=str(bundle_path), require_bundle=True)
+        
+        build_bundle(content_dir, bundle_path, allow_errors=True)
+        loader.open_bundle()
+        assert loader._bundle is not None
+        assert [m["id"] for m in loader.get_modules()] == ["01-a"]
+    
+    def test_refresh_swaps_rebuilt_bundle(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1)
+        bundle_path = tmp_path / "content.bundle"
+        build_bundle(content_dir, bundle_path, allow_errors=True)
+        
+        loader = ContentLoader(str(content_dir), bundle_path=str(bundle_path))
+        assert [m["id"] for m in loader.get_modules()] == ["01-a"]
+        assert loader.refresh().get("bundle") is None
+        
+        write_module(content_dir, "02-b", "Module B", 2)
+        build_bundle(content_dir, bundle_path, allow_errors=True)
+        assert loader.refresh()["bundle"] is True
+        assert [m["id"] for m in loader.get_modules()] == ["01-a", "02-b"]
+    
+    def test_invalid_content_does_not_replace_bundle(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1)
+        bundle_path = tmp_path / "content.bundle"
+        
+        manifest = build_bundle(content_dir, bundle_path)
+        assert manifest["errors"]["exercises"]
+        assert not bundle_path.exists()
+        
+        build_bundle(content_dir, bundle_path, allow_errors=True)
+        version = ContentBundle(bundle_path).version
+        write_module(content_dir, "02-b", "Module B", 2)
+        build_bundle(content_dir, bundle_path)
+        assert ContentBundle(bundle_path).version == version
+
+
+class TestContentSnapshot:
+    """Test sharing one published content snapshot between loaders."""
+    
+    @staticmethod
+    def write_valid_module(root, module_id, title, order):
+        write_module(root, module_id, title, order, exercises=[SAMPLE_EXERCISE])
+        entry = {"term": "Noun", "definition": "A naming word.", "examples": ["cat"], "related_lessons": [], "category": "Parts of Speech"}
+        (root / "glossary.json").write_text(json.dumps([entry]), encoding="utf-8")
+    
+    def test_publish_bumps_version_only_on_change(self, tmp_path):
+        content_dir = tmp_path / "content"
+        self.write_valid_module(content_dir, "01-a", "Module A", 1)
+        snapshot = ContentSnapshot(tmp_path / "snapshot")
+        assert snapshot.current() is None
+        
+        first = snapshot.ensure(content_dir)
+        assert first.counter == 1 and first.path.exists()
+        assert snapshot.ensure(content_dir) == first
+        assert snapshot.publish(content_dir) == first
+        
+        for order in range(2, 5):
+            self.write_valid_module(content_dir, f"0{order}-x", "Module X", order)
+            latest = snapshot.publish(content_dir)
+        assert latest.counter == 4
+        # Only the newest snapshots are kept
+        assert sorted(p.name for p in snapshot.directory.glob("*.bundle")) == [
+            "snapshot-3.bundle", "snapshot-4.bundle"
+        ]
+    
+    def test_invalid_content_is_not_published(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1)
+        snapshot = ContentSnapshot(tmp_path / "snapshot")
+        with pytest.raises(InvalidContentError):
+            snapshot.ensure(content_dir)
+        assert snapshot.current() is None
+        
+        self.write_valid_module(content_dir, "01-a", "Module A", 1)
+        first = snapshot.publish(content_dir)
+        write_module(content_dir, "02-b", "Module B", 2)
+        with pytest.raises(InvalidContentError) as excinfo:
+            snapshot.publish(content_dir)
+        assert excinfo.value.errors["exercises"] == ["Module 02-b: No exercises found"]
+        assert snapshot.current() == first
+        assert sorted(p.name for p in snapshot.directory.glob("*.bundle")) == ["snapshot-1.bundle"]
+    
+    def test_import_does_not_publish(self, tmp_path):
+        import os
+        import subprocess
+        import sys
+        content_dir = tmp_path / "content"
+        self.write_valid_module(content_dir, "01-a", "Module A", 1)
+        snapshot = ContentSnapshot(tmp_path / "snapshot")
+        env = dict(os.environ, CONTENT_SNAPSHOT_DIR=str(snapshot.directory))
+        
+        # Build tooling imports the loader module; only a worker's startup publishes
+        script = (
+            "from app.core.content_loader import ContentLoader, content_loader\n"
+            f"ContentLoader({str(content_dir)!r}).validate_content()\n"
+        )
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, cwd=Path(__file__).parent.parent)
+        assert snapshot.current() is None
+        
+        loader = ContentLoader(str(content_dir), snapshot_dir=str(snapshot.directory))
+        assert snapshot.current() is None
+        loader.open_bundle()
+        assert snapshot.current().counter == 1
+    
+    def test_loaders_share_snapshot(self, tmp_path):
+        content_dir = tmp_path / "content"
+        self.write_valid_module(content_dir, "01-a", "Module A", 1)
+        snapshot_dir = str(tmp_path / "snapshot")
+        
+        workers = [ContentLoader(str(content_dir), snapshot_dir=snapshot_dir) for _ in range(2)]
+        assert all(worker._bundle is not None for worker in workers)
+        assert workers[0]._bundle.path == workers[1]._bundle.path
+        assert [m["id"] for m in workers[1].get_modules()] == ["01-a"]
+        assert workers[1].refresh().get("bundle") is None
+        
+        self.write_valid_module(content_dir, "02-b", "Module B", 2)
+        assert workers[0].publish_snapshot() == 2
+        for worker in workers:
+            changes = worker.refresh()
+            assert changes["bundle"] is True and changes["snapshot"] == 2
+            assert [m["id"] for m in worker.get_modules()] == ["01-a", "02-b"]
+
+
+class TestInvalidationBus:
+    """Test broadcasting content reloads between workers over the file bus."""
+    
+    def test_broadcast_reaches_other_workers(self, tmp_path):
+        workers = [FileBus(str(tmp_path / "bus"), poll_interval=0.02) for _ in range(3)]
+        received = {worker.worker_id: [] for worker in workers}
+        for worker in workers:
+            worker.start(received[worker.worker_id].append)
+        try:
+            deadline = time.monotonic() + 2
+            while workers[0].live_workers() < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            
+            assert workers[0].broadcast("clear-cache", version=3) == 2
+            assert received[workers[0].worker_id] == []
+            for worker in workers[1:]:
+                assert [(m["event"], m["version"]) for m in received[worker.worker_id]] == [("clear-cache", 3)]
+            
+            # A stopped worker no longer counts or acknowledges
+            workers[2].stop()
+            assert workers[0].broadcast("reload") == 1
+            assert len(received[workers[1].worker_id]) == 2
+        finally:
+            for worker in workers:
+                worker.stop()
+    
+    def test_reload_handler_refreshes_content(self, tmp_path):
+        content_dir = tmp_path / "content"
+        write_module(content_dir, "01-a", "Module A", 1)
+        loader = ContentLoader(str(content_dir))
+        assert [m["id"] for m in loader.get_modules()] == ["01-a"]
+        
+        listener = FileBus(str(tmp_path / "bus"), poll_interval=0.02)
+        listener.start(lambda message: loader.refresh())
+        try:
+            write_module(content_dir, "02-b", "Module B", 2)
+            sender = FileBus(str(tmp_path / "bus"), poll_interval=0.02)
+            deadline = time.monotonic() + 2
+            while sender.live_workers() < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert sender.broadcast("reload") == 1
+            assert [m["id"] for m in loader.get_modules()] == ["01-a", "02-b"]
+        finally:
+            listener.stop()
+    
+    def test_logs_are_compacted(self, tmp_path):
+        bus_dir = tmp_path / "bus"
+        bus_dir.mkdir()
+        stale = [{"id": f"old-{i}", "event": "reload", "sender": "gone", "time": 0} for i in range(20)]
+        (bus_dir / "events.log").write_text("".join(json.dumps(m) + "\n" for m in stale))
+        
+        listener = FileBus(str(bus_dir), poll_interval=0.02, max_log_bytes=512)
+        received = []
+        listener.start(received.append)
+        try:
+            sender = FileBus(str(bus_dir), poll_interval=0.02, max_log_bytes=512)
+            deadline = time.monotonic() + 2
+            while sender.live_workers() < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            for version in range(5):
+                assert sender.broadcast("reload", version=version) == 1
+        finally:
+            listener.stop()
+        
+        # Re-reading a compacted log delivers nothing twice
+        assert [m["version"] for m in received] == list(range(5))
+        events = [json.loads(line) for line in (bus_dir / "events.log").read_text().splitlines()]
+        assert [m["version"] for m in events] == list(range(5))
+        assert len((bus_dir / "acks.log").read_text().splitlines()) == 5
+    
+    def test_create_bus(self, tmp_path):
+        assert create_bus("") is None
+        bus = create_bus(f"file://{tmp_path}")
+        assert isinstance(bus, FileBus) and bus.directory == tmp_path
+        assert create_bus(str(tmp_path)).directory == tmp_path
+
+
+class TestLRUCache:
+    """Test cases for the bounded LRU cache."""
+    
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+    
+    def test_size_bound(self):
+        cache = LRUCache(max_entries=10, max_bytes=10, sizeof=len)
+        cache.put("a", "xxxx")
+        cache.put("b", "yyyy")
+        cache.put("c", "zzzz")
+        assert "a" not in cache
+        assert cache.stats()["bytes"] == 8
+        
+        # Values larger than the whole budget are never stored
+        cache.put("d", "x" * 11)
+        assert "d" not in cache
+        assert len(cache) == 2
+    
+    def test_counters(self):
+        cache = LRUCache()
+        assert cache.get("missing") is None
+        cache.put("a", 1)
+        cache.get("a")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+class TestContentEndpoints:
+    """Test content API endpoints."""
+    
+    def test_suggest_glossary_terms(self, client):
+        response = client.get("/api/v1/content/glossary/suggest", params={"prefix": "pro"})
+        assert response.status_code == 200
+        assert response.json() == {"suggestions": ["Pronoun"], "did_you_mean": []}
+        
+        response = client.get("/api/v1/content/glossary/suggest", params={"prefix": "adjectve", "limit": 2})
+        assert response.json() == {"suggestions": [], "did_you_mean": ["Adjective", "Adverb"]}
+        
+        response = client.get("/api/v1/content/glossary/suggest", params={"prefix": "p", "limit": 50})
+        assert response.status_code == 422
+    
+    def test_get_glossary_categories(self, client):
+        response = client.get("/api/v1/content/glossary/categories")
+        assert response.status_code == 200
+        assert "Parts of Speech" in response.json()["categories"]
+    
+    def test_get_exercise(self, client):
+        response = client.get("/api/v1/content/exercises/ex1", params={"module_id": "02-pronouns"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["module_id"] == "02-pronouns"
+        
+        response = client.get(f"/api/v1/content/exercises/{data['content_id']}")
+        assert response.status_code == 200
+        assert response.json()["prompt"] == data["prompt"]
+        
+        response = client.get("/api/v1/content/exercises/missing")
+        assert response.status_code == 404
+    
+    @pytest.mark.parametrize("path", [
+        "/api/v1/content/modules",
+        "/api/v1/content/modules/01-nouns-verbs",
+        "/api/v1/content/modules/01-nouns-verbs/lesson",
+        "/api/v1/content/modules/01-nouns-verbs/lesson?format=html",
+        "/api/v1/content/modules/01-nouns-verbs/lesson/sections",
+        "/api/v1/content/modules/01-nouns-verbs/lesson/sections/1",
+        "/api/v1/content/modules/01-nouns-verbs/exercises",
+        "/api/v1/content/glossary",
+    ])
+    def test_conditional_requests(self, client, path):
+        response = client.get(path)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"]
+        
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        
+        response = client.get(path, headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+    
+    def test_lesson_sections(self, client):
+        path = "/api/v1/content/modules/02-pronouns/lesson/sections"
+        toc = client.get(path).json()["sections"]
+        assert toc[0]["title"] == "Pronouns: Words That Replace Nouns"
+        assert toc[1] == {
+            "index": 1,
+            "level": 2,
+            "title": "Introduction",
+            "id": "introduction",
+            "bytes": toc[1]["bytes"],
+            "subsections_end": 2
+        }
+        
+        section = client.get(f"{path}/1").json()
+        assert section["content"].startswith("## Introduction")
+        assert [s["title"] for s in section["sections"]] == ["Introduction"]
+        
+        what_is = next(s for s in toc if s["id"] == "what-is-a-pronoun")
+        nested = client.get(f"{path}/{what_is['index']}", params={"subsections": True}).json()
+        assert nested["end"] == what_is["subsections_end"]
+        assert "### Example With Pronouns" in nested["content"]
+        
+        ranged = client.get(f"{path}/1", params={"end": 3}).json()
+        assert ranged["content"].startswith("## Introduction")
+        assert "## What is a Pronoun?" in ranged["content"]
+        
+        assert client.get(f"{path}/{len(toc)}").status_code == 404
+        assert client.get(f"{path}/2", params={"end": 1}).status_code == 404
+        assert client.get("/api/v1/content/modules/missing/lesson/sections").status_code == 404
+    
+    def test_lesson_representations(self, client):
+        path = "/api/v1/content/modules/01-nouns-verbs/lesson"
+        markdown_response = client.get(path)
+        html_response = client.get(path, params={"format": "html"})
+        ast_response = client.get(path, params={"format": "ast"})
+        
+        data = html_response.json()
+        assert data["title"] == markdown_response.json()["title"]
+        assert data["html"].startswith('<h1 id="nouns-verbs-the-building-blocks-of-sentences">')
+        assert data["toc"][0]["title"] == "Nouns & Verbs: The Building Blocks of Sentences"
+        assert ast_response.json()["ast"][0]["type"] == "h1"
+        assert len({r.headers["etag"] for r in (markdown_response, html_response, ast_response)}) == 3
+        
+        assert client.get(path, params={"format": "pdf"}).status_code == 422
+        
+        linked = client.get(path, params={"format": "html", "glossary_links": True})
+        assert 'class="glossary-term"' in linked.json()["html"]
+        assert linked.headers["etag"] != html_response.headers["etag"]
+        spans = client.get(path, params={"glossary_links": True}).json()["glossary_terms"]
+        assert {"start", "end", "term"} <= set(spans[0])
+    
+    def test_lesson_removed_before_render(self, client):
+        # The lesson can disappear between loading its metadata and rendering it
+        with patch("app.api.v1.endpoints.content.content_loader.aget_rendered_lesson", AsyncMock(return_value=None)):
+            response = client.get("/api/v1/content/modules/01-nouns-verbs/lesson", params={"format": "html"})
+        assert response.status_code == 404
+    
+    def test_precompressed_responses(self, client):
+        path = "/api/v1/content/modules/01-nouns-verbs/lesson"
+        plain = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["vary"] == "Accept-Encoding"
+        
+        compressed = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["etag"] != plain.headers["etag"]
+        assert compressed.json() == plain.json()
+        
+        # Either representation's ETag validates the other's cache entry
+        response = client.get(path, headers={
+            "Accept-Encoding": "identity",
+            "If-None-Match": compressed.headers["etag"]
+        })
+        assert response.status_code == 304
+    
+    def test_identical_modules_are_cached_separately(self, client, tmp_path):
+        for module_id in ("10-a", "11-b"):
+            write_module(tmp_path, module_id, "Same", 1, exercises=[SAMPLE_EXERCISE])
+        loader = ContentLoader(str(tmp_path))
+        
+        with patch("app.api.v1.endpoints.content.content_loader", loader):
+            etags = set()
+            for module_id in ("10-a", "11-b"):
+                response = client.get(f"/api/v1/content/modules/{module_id}")
+                assert response.json()["module"]["id"] == module_id
+                for path in ("lesson/sections", "lesson/sections/0"):
+                    response = client.get(f"/api/v1/content/modules/{module_id}/{path}")
+                    assert response.json()["module"] == module_id
+                    etags.add(response.headers["etag"])
+            assert len(etags) == 4
+    
+    def test_glossary_etag_varies_with_query(self, client):
+        full = client.get("/api/v1/content/glossary")
+        search = client.get("/api/v1/content/glossary", params={"query": "noun"})
+        assert full.headers["etag"] != search.headers["etag"]
+    
+    def test_glossary_search_falls_back_to_corrections(self, client):
+        response = client.get("/api/v1/content/glossary", params={"query": "prepositon"})
+        assert response.status_code == 200
+        assert response.headers["x-did-you-mean"] == "preposition"
+        assert response.json()[0]["term"] == "Preposition"
+        
+        response = client.get("/api/v1/content/glossary", params={"query": "prepositon", "fuzzy": False})
+        assert response.json() == []
+        assert "x-did-you-mean" not in response.headers
+        assert "x-did-you-mean" not in client.get("/api/v1/content/glossary", params={"query": "noun"}).headers
+    
+    def test_get_glossary_term(self, client):
+        response = client.get("/api/v1/content/glossary/noun")
+        assert response.status_code == 200
+        assert response.json()["term"] == "Noun"
+        
+        response = client.get("/api/v1/content/glossary/nonexistent")
+        assert response.status_code == 404
+
+
+class TestResponseCache:
+    """Test pre-serialized response payloads."""
+    
+    def test_encoded_payload(self):
+        import gzip
+        data = [{"term": "Noun", "definition": "x" * 1000}]
+        payload = EncodedPayload(data)
+        assert json.loads(payload.bodies["identity"]) == data
+        assert json.loads(gzip.decompress(payload.bodies["gzip"])) == data
+        
+        # Small bodies are sent uncompressed
+        assert list(EncodedPayload({"a": 1}).bodies) == ["identity"]
+    
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate", ["identity", "gzip"]) == "gzip"
+        assert choose_encoding("br;q=1.0, gzip;q=0.8", ["identity", "gzip", "br"]) == "br"
+        assert choose_encoding("gzip;q=0", ["identity", "gzip"]) == "identity"
+        assert choose_encoding("*", ["identity", "gzip"]) == "gzip"
+        assert choose_encoding("", ["identity", "gzip"]) == "identity"
+    
+    def test_loader_reuses_payloads(self):
+        loader = ContentLoader("../content")
+        calls = []
+        
+        def build():
+            calls.append(1)
+            return {"a": 1}
+        
+        first = loader.get_encoded_response('"v1"', build)
+        assert loader.get_encoded_response('"v1"', build) is first
+        assert len(calls) == 1
+        assert loader.get_cache_stats()["responses"]["hits"] == 1
+
+
 class TestContentLoaderWithoutFrontmatter:
     """Test ContentLoader without frontmatter library."""
     
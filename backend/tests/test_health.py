@@ -0,0 +1,44 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+from fastapi import status
+from app.core.content_bundle import BundleError
+from app.core.content_loader import content_loader
+from app.main import content_warm_up, readiness_check, warm_up_content
+
+
+class TestHealth:
+    """Test liveness and readiness checks."""
+
+    def test_liveness(self, client):
+        response = client.get("/health/live")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "alive"
+
+        data = client.get("/health").json()
+        assert data["status"] == "healthy"
+        assert data["live"] is True
+
+    def test_ready_after_content_warm_up(self, client):
+        deadline = time.monotonic() + 10
+        response = client.get("/health/ready")
+        while response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE and time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = client.get("/health/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        content = response.json()["content"]
+        assert content["error"] is None
+        assert content["loaded"]["modules"] > 0
+        assert client.get("/health").json()["ready"] is True
+
+    def test_not_ready_without_required_bundle(self):
+        with patch.dict(content_warm_up, {"ready": False, "error": None, "loaded": None}), \
+                patch.object(content_loader, "open_bundle", side_effect=BundleError("bundle missing")):
+            asyncio.run(warm_up_content())
+            assert content_warm_up["ready"] is False
+
+            response = asyncio.run(readiness_check())
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert json.loads(response.body) == {"status": "unavailable", "error": "bundle missing"}
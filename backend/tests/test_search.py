@@ -0,0 +1,159 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from fastapi import status
+
+
+@pytest.fixture
+def headers(client, test_user_data):
+    """Register and log in a user, returning auth headers."""
+    client.post("/api/v1/users/register", json=test_user_data)
+    login_response = client.post("/api/v1/users/login", json={
+        "email": test_user_data["email"],
+        "password": test_user_data["password"]
+    })
+    token = login_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_lesson(client, headers, title, content):
+    module_response = client.post("/api/v1/modules/", json={"title": "Search Module", "order": 1}, headers=headers)
+    lesson_data = {
+        "title": title,
+        "content": content,
+        "order": 1,
+        "module_id": module_response.json()["id"]
+    }
+    response = client.post("/api/v1/lessons/", json=lesson_data, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+class TestSearch:
+    """Test full-text search endpoint."""
+    
+    def test_search_content_lessons(self, client, headers):
+        """Test searching file-based lessons with highlighted snippets."""
+        response = client.get("/api/v1/search/?q=pronouns&source=content&type=lesson", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] >= 1
+        result = data["results"][0]
+        assert result["source"] == "content"
+        assert result["id"] == "02-pronouns"
+        assert "<mark>" in result["snippet"]
+    
+    def test_search_all_content_types(self, client, headers):
+        """Test that one search returns lessons, exercises and glossary entries with facets."""
+        response = client.get("/api/v1/search/?q=pronoun&source=content&limit=100", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        facets = data["facets"]["type"]
+        assert facets["lesson"] >= 1 and facets["exercise"] >= 1 and facets["glossary"] >= 1
+        assert data["total"] == sum(facets.values())
+        assert {result["type"] for result in data["results"]} == {"lesson", "exercise", "glossary"}
+        scores = [result["score"] for result in data["results"]]
+        assert scores == sorted(scores, reverse=True)
+        
+        glossary = [result for result in data["results"] if result["type"] == "glossary"]
+        assert glossary[0]["id"] == "Pronoun"
+        
+        response = client.get("/api/v1/search/?q=pronoun&type=exercise&type=glossary", headers=headers)
+        data = response.json()
+        assert {result["type"] for result in data["results"]} == {"exercise", "glossary"}
+        assert data["facets"]["type"]["lesson"] >= 1
+        assert data["total"] == data["facets"]["type"]["exercise"] + data["facets"]["type"]["glossary"]
+    
+    def test_search_db_lessons(self, client, headers):
+        """Test that created, updated and deleted lessons are reflected."""
+        lesson = create_lesson(client, headers, "Semicolons", "Use a **semicolon** to join clauses.")
+        
+        response = client.get("/api/v1/search/?q=semicolon&source=db", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == [lesson["id"]]
+        assert results[0]["snippet"] == "Use a <mark>semicolon</mark> to join clauses."
+        
+        client.put(f"/api/v1/lessons/{lesson['id']}", json={"content": "Colons introduce lists."}, headers=headers)
+        response = client.get("/api/v1/search/?q=colon&type=lesson", headers=headers)
+        assert [result["id"] for result in response.json()["results"]] == [lesson["id"]]
+        
+        client.delete(f"/api/v1/lessons/{lesson['id']}", headers=headers)
+        response = client.get("/api/v1/search/?q=colon&source=db", headers=headers)
+        assert response.json()["total"] == 0
+    
+    def test_search_picks_up_lessons_written_elsewhere(self, client, headers, db):
+        """Test that lessons added outside the API are indexed on the next search."""
+        from app.models.lesson import Lesson
+        from app.models.module import Module
+        
+        module = Module(title="Direct Module", order=7)
+        db.add(module)
+        db.commit()
+        db.add(Lesson(title="Apostrophes", content="An apostrophe marks possession.", order=1, module_id=module.id))
+        db.commit()
+        
+        response = client.get("/api/v1/search/?q=apostrophes&source=db", headers=headers)
+        assert response.json()["results"][0]["title"] == "Apostrophes"
+        
+        # Edited elsewhere: only updated_at moves (set explicitly, as SQLite's clock has 1 s resolution)
+        lesson = db.query(Lesson).one()
+        lesson.title = "Hyphens"
+        lesson.updated_at = datetime(2100, 1, 1, tzinfo=timezone.utc)
+        db.commit()
+        response = client.get("/api/v1/search/?q=hyphens&source=db", headers=headers)
+        assert response.json()["results"][0]["title"] == "Hyphens"
+    
+    def test_sync_reloads_only_changed_lessons(self, client, headers, db):
+        """Test that a lesson edited elsewhere is re-read without re-reading the others."""
+        from app.core import db_lesson_search
+        from app.models.lesson import Lesson
+        from app.models.module import Module
+        
+        module = Module(title="Direct Module", order=7)
+        db.add(module)
+        db.commit()
+        for title in ("Commas", "Colons", "Periods"):
+            db.add(Lesson(title=title, content=f"All about {title.lower()}.", order=1, module_id=module.id))
+        db.commit()
+        
+        with patch.object(db_lesson_search, "markdown_to_text", wraps=db_lesson_search.markdown_to_text) as parse:
+            response = client.get("/api/v1/search/?q=commas&source=db", headers=headers)
+            assert response.json()["total"] == 1
+            assert parse.call_count == 3
+            
+            lesson = db.query(Lesson).filter(Lesson.title == "Colons").one()
+            lesson.content = "All about semicolons."
+            lesson.updated_at = datetime(2100, 1, 1, tzinfo=timezone.utc)
+            db.commit()
+            response = client.get("/api/v1/search/?q=semicolons&source=db", headers=headers)
+            assert [result["title"] for result in response.json()["results"]] == ["Colons"]
+            assert parse.call_count == 4
+            
+            db.delete(db.query(Lesson).filter(Lesson.title == "Periods").one())
+            db.commit()
+            response = client.get("/api/v1/search/?q=periods&source=db", headers=headers)
+            assert response.json()["total"] == 0
+            assert parse.call_count == 4
+    
+    def test_indexing_errors_do_not_fail_writes(self, client, headers):
+        """Test that a committed write still succeeds when indexing it fails."""
+        from app.core.content_loader import content_loader
+        
+        with patch.object(content_loader.search_index, "add", side_effect=RuntimeError("index down")):
+            lesson = create_lesson(client, headers, "Dashes", "An em dash sets off a phrase.")
+            response = client.put(f"/api/v1/lessons/{lesson['id']}", json={"title": "Dashes!"}, headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+        
+        # The next sync repairs the index
+        response = client.get("/api/v1/search/?q=dash&source=db", headers=headers)
+        assert [result["title"] for result in response.json()["results"]] == ["Dashes!"]
+    
+    def test_search_validation(self, client, headers):
+        """Test query validation and authentication."""
+        assert client.get("/api/v1/search/?q=", headers=headers).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/api/v1/search/?q=noun&source=web", headers=headers).status_code == \
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/api/v1/search/?q=noun&type=video", headers=headers).status_code == \
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/api/v1/search/?q=noun").status_code == 403  # FastAPI HTTPBearer returns 403
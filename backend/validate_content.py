@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Content Validation Script for Grammar Anatomy App
+
+This script validates lessons, exercises and the glossary in the content
+directory for CI and pre-publish hooks. Results are cached between runs so
+only modules whose files changed are re-checked.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.content_loader import ContentLoader
+
+
+def main():
+    """Validate content and exit non-zero when errors are found."""
+    parser = argparse.ArgumentParser(description="Validate the content directory")
+    parser.add_argument("--content-dir", default="../content", help="Content directory to validate")
+    parser.add_argument(
+        "--cache",
+        default=".content-validation-cache.json",
+        help="File storing results between runs"
+    )
+    parser.add_argument("--full", action="store_true", help="Re-check every module, ignoring the cache")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--strict", action="store_true", help="Treat warnings as errors")
+    args = parser.parse_args()
+
+    loader = ContentLoader(args.content_dir, validation_cache_path=args.cache)
+    for result in loader.iter_validation(args.workers, use_cache=not args.full):
+        if "module" in result:
+            failed = any(result["errors"].values())
+            print(f"  {'❌' if failed else '✅'} {result['module']}")
+
+    errors = [error for error_list in result["errors"].values() for error in error_list]
+    warnings = [warning for warning_list in result["warnings"].values() for warning in warning_list]
+
+    for error in errors:
+        print(f"  ❌ {error}")
+    for warning in warnings:
+        print(f"  ⚠️  {warning}")
+
+    summary = result["summary"]
+    print(
+        f"Validated {summary['modules']} modules ({summary['revalidated_modules']} re-checked), "
+        f"{summary['total_exercises']} exercises, {summary['glossary_entries']} glossary entries"
+    )
+
+    if errors or (warnings and args.strict):
+        print("Content validation failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()